@@ -0,0 +1,56 @@
+from bson import ObjectId
+from fastapi import HTTPException
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.config import settings
+
+
+async def insert_many(collection, model, items, id_field, prepare=None):
+    """Validate items with model and insert the valid ones in one unordered insert_many.
+
+    Every item gets a result, in request order: {"index", "_id"} when it was
+    inserted, or {"index", "error"} when it failed validation or its write
+    (e.g. a duplicate key). A failing item does not stop the rest.
+    prepare(document) may fill server-side fields before the insert.
+    """
+    if len(items) > settings.bulk_max_items:
+        raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} items per request")
+
+    results = [None] * len(items)
+    documents, positions = [], []
+    for index, item in enumerate(items):
+        try:
+            document = model.model_validate(item).model_dump(by_alias=True, exclude={id_field})
+        except ValidationError as e:
+            results[index] = {"index": index, "error": e.errors(include_url=False, include_context=False, include_input=False)}
+            continue
+        if prepare:
+            prepare(document)
+        documents.append(document)
+        positions.append(index)
+
+    failed = {}
+    if documents:
+        try:
+            # ordered=False: el servidor sigue con el resto aunque falle alguno
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            failed = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+    # insert_many asigna el _id de cada documento antes de enviarlo
+    for position, (index, document) in enumerate(zip(positions, documents)):
+        if position in failed:
+            results[index] = {"index": index, "error": failed[position]}
+        else:
+            results[index] = {"index": index, "_id": str(document["_id"])}
+
+    inserted = sum("_id" in result for result in results)
+    return {"inserted": inserted, "failed": len(results) - inserted, "results": results}
+
+
+async def attach(collection, cache, owner_id, field, result):
+    # Añade los _id creados a la lista del dueño (users.tasks, teams.backlog, ...) en una sola escritura
+    ids = [item["_id"] for item in result["results"] if "_id" in item]
+    if ids:
+        await collection.update_one({"_id": ObjectId(owner_id)}, {"$addToSet": {field: {"$each": ids}}})
+        cache.invalidate(owner_id)
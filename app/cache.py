@@ -0,0 +1,79 @@
+import copy
+import time
+from collections import OrderedDict
+
+from bson import ObjectId
+
+from app import coalescing
+from app.config import settings
+from app.database import database
+from app.loaders import forget
+from app.services.metrics import labels, metrics
+
+
+class DocumentCache:
+    """Read-through LRU cache with TTL for documents looked up by _id.
+
+    Misses go to a coalesced find_one (concurrent misses for the same
+    document share one query) and the result, "not found" included, is kept
+    for ttl seconds, evicting the least recently used entry beyond
+    max_entries.
+    Callers get a deep copy, so handlers may mutate what they receive.
+    Write paths call invalidate() once their write has completed, which
+    also drops the document from the request's loader (app.loaders); a lookup
+    that was already in flight when an invalidation happened does not store
+    its result. The cache is per process, so other workers may serve a
+    document up to ttl seconds old.
+    """
+
+    def __init__(self, name, ttl=None, max_entries=None):
+        self.name = name
+        self.collection = database[name]
+        self.ttl = settings.cache_ttl_seconds if ttl is None else ttl
+        self.max_entries = settings.cache_max_entries if max_entries is None else max_entries
+        self._entries = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, result):
+        metrics.inc("document_cache_requests_total", labels(cache=self.name, result=result))
+
+    async def get(self, document_id):
+        key = str(document_id)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self._count("hit")
+            return copy.deepcopy(entry[1])
+
+        self.misses += 1
+        self._count("miss")
+        generation = self._generation
+        document = await coalescing.find_one(self.collection, {"_id": ObjectId(document_id)})
+        if generation == self._generation:
+            self._entries[key] = (time.monotonic() + self.ttl, document)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return copy.deepcopy(document)
+
+    def invalidate(self, *document_ids):
+        self._generation += 1
+        for document_id in document_ids:
+            self._entries.pop(str(document_id), None)
+            coalescing.forget(self.collection, {"_id": ObjectId(document_id)})
+        # Los loaders del request en curso tampoco deben devolver la copia anterior
+        forget(self.name, *document_ids)
+
+    def clear(self):
+        self._generation += 1
+        self._entries.clear()
+
+
+users_cache = DocumentCache("users")
+teams_cache = DocumentCache("teams")
+courses_cache = DocumentCache("courses")
+schedules_cache = DocumentCache("schedules")
+kanban_boards_cache = DocumentCache("kanban_boards")
@@ -0,0 +1,45 @@
+import asyncio
+
+import bson
+
+from app.services.metrics import labels, metrics
+
+# Lecturas en curso por (colección, filtro, proyección) codificados en BSON
+_in_flight = {}
+
+
+def read_key(collection, filter, projection=None):
+    return collection.name, bson.encode(filter), bson.encode(projection) if projection else b""
+
+
+def _done(key, task):
+    if _in_flight.get(key) is task:
+        del _in_flight[key]
+    # Marca la excepción como leída aunque todos los que esperaban se hayan ido
+    if not task.cancelled():
+        task.exception()
+
+
+async def find_one(collection, filter, projection=None):
+    """find_one shared by every concurrent caller with the same read.
+
+    The first caller starts the query as its own task and later callers with
+    the same collection, filter and projection await that task instead of
+    sending another one. The task is shielded, so a caller that disconnects
+    does not cancel it for the rest. All callers get the same document
+    object: copy it before mutating.
+    """
+    key = read_key(collection, filter, projection)
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(collection.find_one(filter, projection))
+        _in_flight[key] = task
+        task.add_done_callback(lambda done: _done(key, done))
+    else:
+        metrics.inc("mongo_reads_coalesced_total", labels(collection=collection.name))
+    return await asyncio.shield(task)
+
+
+def forget(collection, filter, projection=None):
+    # Tras una escritura, las lecturas nuevas no deben unirse a una lanzada antes
+    _in_flight.pop(read_key(collection, filter, projection), None)
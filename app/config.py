@@ -0,0 +1,94 @@
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Service settings, read from the environment or the .env file.
+
+    Names are case-insensitive, so MONGO_URI still sets mongo_uri.
+    """
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    mongo_uri: str = "mongodb://localhost:27017/"
+    db_name: str = "universe_app"
+    mongo_app_name: str = "group33-backend"
+
+    # Pool de conexiones de Motor; se dimensiona según la concurrencia esperada
+    mongo_min_pool_size: int = 0
+    mongo_max_pool_size: int = 100
+    mongo_max_idle_time_ms: Optional[int] = None
+    mongo_wait_queue_timeout_ms: Optional[int] = None
+    mongo_server_selection_timeout_ms: int = 30000
+    # Compresión de red separada por comas, p. ej. "zstd,zlib" (zstd y snappy
+    # necesitan los paquetes zstandard / python-snappy; zlib viene con Python)
+    mongo_compressors: str = ""
+
+    # Caché en memoria de documentos por _id (users, teams, courses, schedules, kanban_boards)
+    cache_ttl_seconds: float = 30
+    cache_max_entries: int = 2048
+
+    # Tamaño de página de los listados: por defecto y máximo que se puede pedir con ?limit=
+    page_size_default: int = 100
+    page_size_max: int = 500
+
+    # Documentos por batch del cursor en las exportaciones NDJSON (/export)
+    export_batch_size: int = 1000
+
+    # Máximo de elementos por request en los endpoints /bulk
+    bulk_max_items: int = 1000
+
+    # Historial de los rollups del dashboard, contado desde el registro más reciente: las filas
+    # por hora (conteos e histogramas de latencia) ya están sumadas en las diarias
+    rollup_hourly_retention_days: int = 31
+    rollup_daily_retention_days: int = 400
+
+    # Log de requests: lo escribe el pipeline de logging y lo lee el dashboard; su checkpoint va al lado
+    log_file: str = "logs_app.log"
+
+    # Backend de los gráficos del dashboard: "stream", "pandas" o "segments"
+    analytics_backend: str = "stream"
+    # Segundos que un dashboard renderizado se sirve sin revisar el log
+    dashboard_cache_ttl: float = 60
+    # Consultas por ventana (/dashboard?from=..., /dashboard/data, /dashboard/latency) a la vez por worker
+    dashboard_max_window_requests: int = 4
+    # Si está configurado, cada request se guarda además en segmentos binarios en este directorio
+    telemetry_segments_dir: Optional[str] = None
+
+    # Pipeline de logging: cola acotada, escritura por lotes y rotación por tamaño
+    log_queue_size: int = 10000
+    log_batch_size: int = 256
+    log_flush_interval: float = 1.0
+    log_max_bytes: int = 10 * 1024 * 1024
+    log_backup_count: int = 5
+
+    # Con varios workers de uvicorn, cada proceso deja su snapshot de métricas en este directorio
+    metrics_multiproc_dir: Optional[str] = None
+    # Comandos de Mongo por request a partir de los cuales se registra un warning
+    mongo_query_budget: int = 10
+
+    # Token para las rutas /admin y para pedir un perfil con la cabecera X-Profile
+    admin_token: Optional[str] = None
+    # Fracción de requests que se perfilan sin pedirlo (0 = ninguna)
+    profile_sample_rate: float = 0
+    profile_interval: float = 0.005
+    max_profiles: int = 50
+
+    def mongo_client_options(self):
+        options = {
+            "appname": self.mongo_app_name,
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxPoolSize": self.mongo_max_pool_size,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+        }
+        if self.mongo_max_idle_time_ms is not None:
+            options["maxIdleTimeMS"] = self.mongo_max_idle_time_ms
+        if self.mongo_wait_queue_timeout_ms is not None:
+            options["waitQueueTimeoutMS"] = self.mongo_wait_queue_timeout_ms
+        if self.mongo_compressors:
+            options["compressors"] = self.mongo_compressors
+        return options
+
+
+settings = Settings()
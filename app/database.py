@@ -1,16 +1,64 @@
-from dotenv import load_dotenv
-import os
+from motor.motor_asyncio import AsyncIOMotorClient
 
-# Carga las variables de entorno desde el archivo .env
-load_dotenv()
+from app.config import settings
+from app.services.metrics import PoolMetricsListener
+from app.services.query_stats import QueryStatsListener
 
-# MongoDB connection URI
-MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017/")
+# El cliente se crea y se cierra en el lifespan de la app (ver main.py)
+client = None
 
-# Database name
-DB_NAME = "universe_app"
 
-# Crear cliente MongoDB
-from motor.motor_asyncio import AsyncIOMotorClient
-client = AsyncIOMotorClient(MONGO_URI)
-database = client[DB_NAME]
+def connect():
+    global client
+    if client is None:
+        client = AsyncIOMotorClient(
+            settings.mongo_uri,
+            event_listeners=[PoolMetricsListener(), QueryStatsListener()],
+            **settings.mongo_client_options(),
+        )
+    return client
+
+
+def close():
+    global client
+    if client is not None:
+        client.close()
+        client = None
+
+
+class LazyCollection:
+    """Collection handle that resolves against the current client on use.
+
+    Routers take their collections at import time, before the lifespan has
+    connected, so each attribute access is forwarded to the real Motor
+    collection of whichever client is connected now.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._client = None
+        self._collection = None
+
+    def _resolve(self):
+        if client is None:
+            raise RuntimeError("MongoDB client is not connected")
+        if self._client is not client:
+            self._collection = client[settings.db_name][self.name]
+            self._client = client
+        return self._collection
+
+    def __getattr__(self, attr):
+        return getattr(self._resolve(), attr)
+
+
+class LazyDatabase:
+    def __init__(self):
+        self._collections = {}
+
+    def __getitem__(self, name):
+        if name not in self._collections:
+            self._collections[name] = LazyCollection(name)
+        return self._collections[name]
+
+
+database = LazyDatabase()
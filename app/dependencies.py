@@ -0,0 +1,25 @@
+from typing import Optional
+
+from fastapi import Header, HTTPException, Query
+
+from app.config import settings
+from app.services.profiling import is_admin_token
+
+
+# Protege las rutas de administración con la cabecera X-Admin-Token
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+# Parámetros de paginación de los listados (ver app.pagination.paginate)
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(settings.page_size_default, ge=1, le=settings.page_size_max),
+        cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+        sort: Optional[str] = Query(None, pattern=r"^-?\w+$", description="Field to sort by, '-' for descending"),
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.sort = sort
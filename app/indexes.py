@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import sys
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app import database
+
+# Índices que necesitan las consultas de las rutas, por colección. Se crean al arrancar;
+# `python -m app.indexes` compara este registro con la base y el uso según $indexStats
+# (`--apply` crea los que falten)
+INDEXES = {
+    # login y las solicitudes de amistad por email
+    "users": [IndexModel([("email", ASCENDING)], unique=True)],
+    # Los listados paginan por (filtro, [orden,] _id): los índices terminan en _id
+    # para que cada página sea un recorrido acotado del índice
+    "notes": [
+        IndexModel([("subject", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("tags", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("created_date", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "reminders": [
+        IndexModel([("user_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("user_id", ASCENDING), ("remind_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("entity_id", ASCENDING), ("entity_type", ASCENDING), ("_id", ASCENDING)]),
+    ],
+    "friend_requests": [
+        IndexModel([("receiver_id", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("sender_id", ASCENDING), ("receiver_id", ASCENDING), ("status", ASCENDING)]),
+    ],
+    "calculator": [IndexModel([("owner_id", ASCENDING), ("_id", ASCENDING)])],
+    "schedules": [IndexModel([("user_id", ASCENDING)])],
+    "kanban_boards": [IndexModel([("user_id", ASCENDING)])],
+    "tasks": [IndexModel([("due_date", ASCENDING), ("_id", ASCENDING)])],
+    "meetings": [IndexModel([("start_time", ASCENDING), ("_id", ASCENDING)])],
+}
+
+
+async def ensure_collection_indexes(name, indexes):
+    # create_indexes no hace nada si el índice ya existe con la misma definición
+    try:
+        await database.database[name].create_indexes(indexes)
+    except OperationFailure as e:
+        # Índice existente con otras opciones, o duplicados que impiden el unique
+        logging.error(f"Could not create indexes on {name}: {e}")
+
+
+async def ensure_indexes():
+    try:
+        await asyncio.gather(*(ensure_collection_indexes(name, indexes) for name, indexes in INDEXES.items()))
+    except PyMongoError as e:
+        logging.error(f"Index bootstrap failed: {e}")
+
+
+async def index_report():
+    report = []
+    for name, indexes in INDEXES.items():
+        collection = database.database[name]
+        existing = {index["name"] async for index in collection.list_indexes()}
+        usage = {stats["name"]: stats["accesses"]["ops"] async for stats in collection.aggregate([{"$indexStats": {}}])}
+        declared = [index.document["name"] for index in indexes]
+        for index_name in declared:
+            if index_name not in existing:
+                report.append((name, index_name, "missing", None))
+            else:
+                report.append((name, index_name, "unused" if usage.get(index_name, 0) == 0 else "ok", usage.get(index_name)))
+        for index_name in sorted(existing - set(declared) - {"_id_"}):
+            report.append((name, index_name, "not declared", usage.get(index_name)))
+    return report
+
+
+async def main(apply=False):
+    database.connect()
+    try:
+        if apply:
+            await ensure_indexes()
+        report = await index_report()
+    finally:
+        database.close()
+    width = max((len(f"{name}.{index}") for name, index, _, _ in report), default=0)
+    for name, index, status, ops in report:
+        print(f"{f'{name}.{index}':<{width}}  {status:<12}  ops={'-' if ops is None else ops}")
+    return any(status == "missing" for _, _, status, _ in report)
+
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main(apply="--apply" in sys.argv[1:])) else 0)
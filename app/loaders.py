@@ -0,0 +1,89 @@
+import asyncio
+import contextvars
+
+from bson import ObjectId
+
+from app.database import database
+
+# Loaders del request en curso, por colección; el middleware crea uno vacío por request
+current_loaders = contextvars.ContextVar("current_loaders", default=None)
+
+
+class DocumentLoader:
+    """Batches by-_id lookups on one collection within a request.
+
+    load() calls made during the same event-loop tick, including those of
+    tasks started in it, are sent together as a single
+    find({"_id": {"$in": [...]}}). Keys are deduplicated and every result,
+    "not found" (None) included, is kept for the rest of the request, so
+    callers share the returned documents. Write paths call forget() after
+    writing, so a later load() in the same request reads the new version.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._futures = {}
+        self._pending = []
+
+    def load(self, document_id):
+        # ObjectId inválido: falla sólo quien lo pidió, como con find_one
+        object_id = ObjectId(document_id)
+        key = str(object_id)
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._pending.append(object_id)
+            if len(self._pending) == 1:
+                # Dos saltos: las tasks creadas en este mismo tick (gather de corutinas)
+                # dan su primer paso antes del envío y entran en el mismo lote
+                loop.call_soon(loop.call_soon, self._dispatch)
+        # shield: si un llamador se cancela, los demás siguen esperando el mismo resultado
+        return asyncio.shield(future)
+
+    async def load_many(self, document_ids):
+        # En el orden pedido, sin repetidos; los que no existen quedan fuera (como con $in)
+        documents = await asyncio.gather(*(self.load(document_id) for document_id in dict.fromkeys(map(str, document_ids))))
+        return [document for document in documents if document is not None]
+
+    def clear(self, document_id):
+        self._futures.pop(str(document_id), None)
+
+    def _dispatch(self):
+        object_ids, self._pending = self._pending, []
+        asyncio.ensure_future(self._fetch(object_ids))
+
+    async def _fetch(self, object_ids):
+        futures = [(str(object_id), self._futures.get(str(object_id))) for object_id in object_ids]
+        try:
+            documents = await self.collection.find({"_id": {"$in": object_ids}}).to_list(None)
+        except Exception as e:
+            for key, future in futures:
+                if future is not None and not future.done():
+                    future.set_exception(e)
+                    # Que un próximo load() lo vuelva a intentar
+                    if self._futures.get(key) is future:
+                        del self._futures[key]
+            return
+        found = {str(document["_id"]): document for document in documents}
+        for key, future in futures:
+            if future is not None and not future.done():
+                future.set_result(found.get(key))
+
+
+def forget(name, *document_ids):
+    # Tras una escritura, el loader del request no sigue sirviendo la copia anterior
+    loaders = current_loaders.get()
+    if loaders and name in loaders:
+        for document_id in document_ids:
+            loaders[name].clear(document_id)
+
+
+def loader(name):
+    loaders = current_loaders.get()
+    if loaders is None:
+        # Fuera de un request no hay nada que compartir
+        return DocumentLoader(database[name])
+    if name not in loaders:
+        loaders[name] = DocumentLoader(database[name])
+    return loaders[name]
@@ -0,0 +1,92 @@
+import logging
+import time
+
+from starlette.datastructures import URL
+
+from app.loaders import current_loaders
+from app.services.metrics import metrics
+from app.services.profiling import PROFILING_ENABLED, finish_profile, start_profile, wants_profile
+from app.services.query_stats import MONGO_QUERY_BUDGET, QueryStats, current_query_stats
+
+
+class RequestLogMiddleware:
+    """Pure ASGI middleware that writes one log line per HTTP request.
+
+    The request stream is passed through untouched: body presence comes from
+    the Content-Length / Transfer-Encoding headers, or else from the first
+    http.request message the app receives. The status is taken from
+    http.response.start and the duration once the last body chunk is sent,
+    which is also when the request is counted in the worker metrics.
+
+    MongoDB commands run while serving the request are collected in a
+    QueryStats, reported in a Server-Timing header and checked against
+    MONGO_QUERY_BUDGET. Each request also gets its own set of batching
+    document loaders (app.loaders).
+
+    With profiling enabled (ADMIN_TOKEN set), a request sent with
+    X-Profile: <admin token>, or picked by PROFILE_SAMPLE_RATE, is profiled
+    with a stack sampler and kept for /admin/profiles.
+    """
+
+    def __init__(self, app, segment_writer=None):
+        self.app = app
+        self.segment_writer = segment_writer
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        metrics.request_started()
+        headers = dict(scope["headers"])
+        # Con Content-Length o Transfer-Encoding sabemos si hay body sin leerlo
+        has_body = headers.get(b"content-length", b"0") not in (b"", b"0") or b"transfer-encoding" in headers
+        status_code = None
+        logged = False
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        loaders_token = current_loaders.set({})
+        profile = start_profile() if PROFILING_ENABLED and wants_profile(headers) else None
+
+        async def receive_wrapper():
+            nonlocal has_body
+            message = await receive()
+            if message["type"] == "http.request" and message.get("body"):
+                has_body = True
+            return message
+
+        def log(status):
+            nonlocal logged
+            logged = True
+            duration_ms = (time.perf_counter() - start) * 1000
+            # Plantilla de la ruta que atendió el request, p. ej. /users/{user_id}/tasks
+            route = scope.get("route")
+            route_path = route.path if route else ""
+            client = scope.get("client")
+            metrics.request_finished(scope["method"], route_path or "-", status, duration_ms)
+            logging.info(f"IP: {client[0] if client else None} - Method: {scope['method']} - URL: {URL(scope=scope)} - Body: {has_body} Response: {status} - Route: {route_path or '-'} - Duration: {duration_ms:.2f}ms")
+            if self.segment_writer:
+                self.segment_writer.append(time.time(), scope["method"], route_path, scope["path"], status, duration_ms)
+            if stats.over_budget():
+                logging.warning(f"Mongo query budget exceeded: {scope['method']} {route_path or scope['path']} made {stats.commands} commands (budget {MONGO_QUERY_BUDGET}): {stats.describe()}")
+            if profile:
+                finish_profile(*profile, scope["method"], scope["path"], route_path, status, duration_ms)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", stats.server_timing().encode("latin-1"))]}
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False) and not logged:
+                log(status_code)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            # Excepción o respuesta sin terminar (cliente desconectado)
+            if not logged:
+                log(status_code or 500)
+            current_query_stats.reset(token)
+            current_loaders.reset(loaders_token)
@@ -0,0 +1,76 @@
+import base64
+import binascii
+
+from bson import json_util
+from fastapi import HTTPException
+
+from app.responses import BSONResponse
+
+
+def encode_cursor(sort, document, field):
+    payload = {"s": sort, "id": document["_id"]}
+    if field:
+        payload["v"] = document.get(field)
+    return base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if payload["s"] != sort or "id" not in payload:
+            raise ValueError
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return payload
+
+
+def after_cursor(field, direction, payload):
+    # Documentos estrictamente posteriores al último de la página anterior en el orden (campo, _id)
+    op = "$gt" if direction == 1 else "$lt"
+    if not field:
+        return {"_id": {op: payload["id"]}}
+    value = payload.get("v")
+    clauses = [{field: value, "_id": {op: payload["id"]}}]
+    # Mongo ordena null/ausente antes que cualquier valor
+    if value is None:
+        if direction == 1:
+            clauses.append({field: {"$ne": None}})
+    else:
+        clauses.append({field: {op: value}})
+        if direction == -1:
+            clauses.append({field: None})
+    return {"$or": clauses}
+
+
+async def paginate(collection, filter, page, sort_fields=()):
+    """One page of collection.find(filter), as a BSONResponse, using an _id keyset cursor.
+
+    Pages are ordered by _id, or by one of sort_fields (each backed by an
+    index ending in _id) with _id as tie-breaker; "-field" sorts descending.
+    The query resumes after the last document of the previous page instead
+    of skipping, so every page costs the same. When there are more documents
+    the opaque cursor for the next page is set in the X-Next-Cursor header.
+    """
+    sort = page.sort or "_id"
+    direction = -1 if sort.startswith("-") else 1
+    field = sort.lstrip("-")
+    if field == "_id":
+        field = None
+    elif field not in sort_fields:
+        raise HTTPException(status_code=400, detail=f"Cannot sort by '{field}'")
+
+    query = filter
+    if page.cursor:
+        condition = after_cursor(field, direction, decode_cursor(page.cursor, sort))
+        query = {"$and": [filter, condition]} if filter else condition
+    order = [(field, direction), ("_id", direction)] if field else [("_id", direction)]
+    # Un documento de más para saber si hay otra página
+    documents = await collection.find(query).sort(order).limit(page.limit + 1).to_list(None)
+    next_cursor = None
+    if len(documents) > page.limit:
+        documents = documents[:page.limit]
+        next_cursor = encode_cursor(sort, documents[-1], field)
+    response = BSONResponse(documents)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
@@ -0,0 +1,160 @@
+import asyncio
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from pymongo import ReturnDocument
+
+from app.config import settings
+
+
+class Relationship:
+    """An array field of ids on owner documents (users.tasks, schedules.meetings, ...).
+
+    link() and unlink() put the "already linked" / "not linked" precondition
+    in the update filter, so the check and the write are one atomic
+    operation, and look the target up concurrently with the write: the common
+    path is a single round trip. Only a write that matched nothing costs one
+    more query, to tell a missing owner (404) from a failed precondition
+    (400, or success when the detail is None). A write made for a target that
+    turns out not to exist is undone before answering 404; the write returns
+    the lists as they were, so an unlinked id goes back to its position.
+
+    link_many() and unlink_many() do the same for a list of ids with one $in
+    query on targets and one $addToSet $each / $pull $in.
+    """
+
+    def __init__(self, collection, cache, field, find_target, owner, target, linked=None, not_linked=None, also=(), targets=None,
+                 link_missing=None):
+        self.collection = collection
+        self.cache = cache
+        self.fields = (field, *also)  # also: otras listas que se actualizan a la vez (p. ej. open_tasks)
+        self.find_target = find_target
+        self.targets = targets
+        self.owner = owner
+        self.target = target
+        self.linked = linked
+        self.not_linked = not_linked
+        # Algunas rutas contestan link() con otro texto (p. ej. "document not found")
+        self.link_missing = link_missing or f"{target} not found"
+
+    async def link(self, owner_id, target_id):
+        await self._mutate(
+            owner_id, target_id,
+            {self.fields[0]: {"$ne": target_id}},
+            {"$push": {field: target_id for field in self.fields}},
+            # Sólo se añadió una vez gracias al $ne del filtro
+            lambda before: {"$pull": {field: target_id for field in self.fields}},
+            self.linked,
+            self.link_missing,
+        )
+
+    async def unlink(self, owner_id, target_id):
+        await self._mutate(
+            owner_id, target_id,
+            {self.fields[0]: target_id},
+            {"$pull": {field: target_id for field in self.fields}},
+            # Vuelve a su posición en cada lista que lo tenía
+            lambda before: {"$push": {
+                field: {"$each": [target_id], "$position": before[field].index(target_id)}
+                for field in self.fields if target_id in before.get(field, [])
+            }},
+            self.not_linked,
+            f"{self.target} not found",
+        )
+
+    def _owner_key(self, owner_id):
+        try:
+            return ObjectId(owner_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=404, detail=f"{self.owner} not found")
+
+    async def _mutate(self, owner_id, target_id, precondition, update, undo, conflict, missing):
+        # Ids inválidos fallan antes de escribir nada
+        owner_key = self._owner_key(owner_id)
+        try:
+            ObjectId(target_id)
+        except (InvalidId, TypeError):
+            raise HTTPException(status_code=404, detail=missing)
+        # El documento de antes del cambio (sólo las listas) sirve para deshacerlo
+        before, target = await asyncio.gather(
+            self.collection.find_one_and_update(
+                {"_id": owner_key, **precondition}, update,
+                projection={field: 1 for field in self.fields}, return_document=ReturnDocument.BEFORE,
+            ),
+            self.find_target(target_id),
+            return_exceptions=True,
+        )
+        if isinstance(before, BaseException):
+            raise before
+        if before is not None:
+            try:
+                if isinstance(target, BaseException) or target is None:
+                    await self.collection.update_one({"_id": owner_key}, undo(before))
+                    if isinstance(target, BaseException):
+                        raise target
+                    raise HTTPException(status_code=404, detail=missing)
+            finally:
+                self.cache.invalidate(owner_id)
+            return
+
+        if isinstance(target, BaseException):
+            raise target
+        if not await self.collection.find_one({"_id": owner_key}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail=f"{self.owner} not found")
+        if target is None:
+            raise HTTPException(status_code=404, detail=missing)
+        if conflict:
+            raise HTTPException(status_code=400, detail=conflict)
+
+    async def link_many(self, owner_id, target_ids):
+        existing, missing = await self._existing(target_ids)
+        before = await self._update_many(owner_id, {"$addToSet": {field: {"$each": existing} for field in self.fields}}, existing)
+        return {
+            "added": [target_id for target_id in existing if target_id not in before],
+            "already_present": [target_id for target_id in existing if target_id in before],
+            "missing": missing,
+        }
+
+    async def unlink_many(self, owner_id, target_ids):
+        existing, missing = await self._existing(target_ids)
+        before = await self._update_many(owner_id, {"$pull": {field: {"$in": existing} for field in self.fields}}, existing)
+        return {
+            "removed": [target_id for target_id in existing if target_id in before],
+            "not_present": [target_id for target_id in existing if target_id not in before],
+            "missing": missing,
+        }
+
+    async def _existing(self, target_ids):
+        # Sin repetidos y en el orden pedido; los ids inválidos cuentan como inexistentes
+        target_ids = list(dict.fromkeys(target_ids))
+        if len(target_ids) > settings.bulk_max_items:
+            raise HTTPException(status_code=400, detail=f"At most {settings.bulk_max_items} ids per request")
+        keys = []
+        for target_id in target_ids:
+            try:
+                keys.append(ObjectId(target_id))
+            except (InvalidId, TypeError):
+                pass
+        found = set()
+        if keys:
+            documents = await self.targets.find({"_id": {"$in": keys}}, {"_id": 1}).to_list(None)
+            found = {str(document["_id"]) for document in documents}
+        existing = [target_id for target_id in target_ids if target_id in found]
+        return existing, [target_id for target_id in target_ids if target_id not in found]
+
+    async def _update_many(self, owner_id, update, existing):
+        # Devuelve la lista antes del cambio, para saber qué ids ya estaban
+        owner_key = self._owner_key(owner_id)
+        if existing:
+            document = await self.collection.find_one_and_update(
+                {"_id": owner_key}, update, projection={self.fields[0]: 1}, return_document=ReturnDocument.BEFORE
+            )
+        else:
+            document = await self.collection.find_one({"_id": owner_key}, {self.fields[0]: 1})
+        if document is None:
+            raise HTTPException(status_code=404, detail=f"{self.owner} not found")
+        before = set(document.get(self.fields[0], []))
+        if existing:
+            self.cache.invalidate(owner_id)
+        return before
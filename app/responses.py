@@ -0,0 +1,25 @@
+import orjson
+from bson import Decimal128, ObjectId
+from fastapi.responses import JSONResponse
+
+
+def bson_default(value):
+    # orjson ya serializa datetime, UUID y dataclasses; esto cubre los tipos de BSON
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        # Como texto, para no perder precisión
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class BSONResponse(JSONResponse):
+    """JSON response that serializes Mongo documents as they come from Motor.
+
+    ObjectId and Decimal128 become strings and datetimes ISO 8601, at any
+    depth, through orjson's default hook. Returning a BSONResponse from an
+    endpoint also skips FastAPI's jsonable_encoder pass over the content.
+    """
+
+    def render(self, content):
+        return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from app.dependencies import require_admin
+from app.services.profiling import collapsed, profiles
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+# List stored request profiles, newest first
+@router.get("/profiles")
+async def get_profiles():
+    return [
+        {key: value for key, value in profile.items() if key != "stacks"}
+        for profile in reversed(profiles)
+    ]
+
+# Get one profile as collapsed stacks (flamegraph.pl / speedscope input)
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    for profile in profiles:
+        if profile["id"] == profile_id:
+            return collapsed(profile)
+    raise HTTPException(status_code=404, detail="Profile not found")
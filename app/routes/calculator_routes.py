@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
 from app.models.calculator import CalculatorSubject
 from bson import ObjectId
 from datetime import datetime
@@ -20,19 +23,15 @@ async def create_subject(subject: CalculatorSubject):
 
 # Obtener todas las materias de un usuario
 @router.get("/user/{owner_id}")
-async def get_subjects_by_user(owner_id: str):
-    subjects = await calculator_collection.find({"owner_id": owner_id}).to_list(100)
-    for subject in subjects:
-        subject["_id"] = str(subject["_id"])
-    return subjects
+async def get_subjects_by_user(owner_id: str, page: PageParams = Depends()):
+    return await paginate(calculator_collection, {"owner_id": owner_id}, page)
 
 # Obtener una materia específica por ID
 @router.get("/{subject_id}")
 async def get_subject(subject_id: str):
     subject = await calculator_collection.find_one({"_id": ObjectId(subject_id)})
     if subject:
-        subject["_id"] = str(subject["_id"])
-        return subject
+        return BSONResponse(subject)
     raise HTTPException(status_code=404, detail="Subject not found")
 
 # Actualizar una materia
@@ -55,13 +54,9 @@ async def delete_subject(subject_id: str):
 
 @router.delete("/user/{owner_id}")
 async def delete_subjects_by_user(owner_id: str):
-    subjects = await calculator_collection.find({"owner_id": owner_id}).to_list(100)
-    if not subjects:
+    # Un solo delete_many en vez de leer (máx. 100) y borrar uno por uno
+    result = await calculator_collection.delete_many({"owner_id": owner_id})
+    if not result.deleted_count:
         raise HTTPException(status_code=404, detail="No subjects found for this user")
 
-    deleted_count = 0
-    for subject in subjects:
-        result = await calculator_collection.delete_one({"_id": subject["_id"]})
-        deleted_count += result.deleted_count
-
-    return {"message": f"Deleted {deleted_count} subject(s) for user {owner_id}"}
+    return {"message": f"Deleted {result.deleted_count} subject(s) for user {owner_id}"}
@@ -1,5 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, Body, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app.cache import courses_cache, users_cache
+from app.loaders import loader
+from app.relationships import Relationship
 from app.models.course import Course
 from bson import ObjectId
 
@@ -8,6 +15,14 @@ router = APIRouter(prefix="/courses", tags=["Courses"])
 courses_collection = database["courses"]
 users_collection = database["users"]  # For checking members
 documents_collection = database["documents"]  # For checking documents
+notes_collection = database["notes"]  # For checking notes
+
+# Listas del curso para los endpoints /bulk
+course_relationships = {
+    "members": Relationship(courses_collection, courses_cache, "members", users_cache.get, "Course", "User", targets=users_collection),
+    "documents": Relationship(courses_collection, courses_cache, "documents", lambda document_id: loader("documents").load(document_id), "Course", "Document", targets=documents_collection),
+    "notes": Relationship(courses_collection, courses_cache, "notes", lambda note_id: loader("notes").load(note_id), "Course", "Note", targets=notes_collection),
+}
 
 # Create a new course
 @router.post("/", response_model=Course)
@@ -19,19 +34,15 @@ async def create_course(course: Course):
 
 # Get all courses
 @router.get("/")
-async def get_courses():
-    courses = await courses_collection.find().to_list(100)
-    for course in courses:
-        course["_id"] = str(course["_id"])
-    return courses
+async def get_courses(page: PageParams = Depends()):
+    return await paginate(courses_collection, {}, page)
 
 # Get a single course by ID
 @router.get("/{course_id}")
 async def get_course(course_id: str):
-    course = await courses_collection.find_one({"_id": ObjectId(course_id)})
+    course = await courses_cache.get(course_id)
     if course:
-        course["_id"] = str(course["_id"])
-        return course
+        return BSONResponse(course)
     raise HTTPException(status_code=404, detail="Course not found")
 
 # Update a course by ID
@@ -39,6 +50,7 @@ async def get_course(course_id: str):
 async def update_course(course_id: str, updated_course: Course):
     course_dict = updated_course.model_dump(exclude_unset=True, by_alias=True)
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$set": course_dict})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Course updated successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
@@ -47,14 +59,30 @@ async def update_course(course_id: str, updated_course: Course):
 @router.delete("/{course_id}")
 async def delete_course(course_id: str):
     result = await courses_collection.delete_one({"_id": ObjectId(course_id)})
+    courses_cache.invalidate(course_id)
     if result.deleted_count:
         return {"message": "Course deleted successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
 
+# Add many members, documents or notes to a course at once
+# (declared before /{course_id}/{relation}/{id}, which would take "bulk" as an id)
+@router.post("/{course_id}/{relation}/bulk")
+async def add_many_to_course(course_id: str, relation: str, ids: List[str] = Body(...)):
+    if relation not in course_relationships:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await course_relationships[relation].link_many(course_id, ids)
+
+# Remove many members, documents or notes from a course at once
+@router.post("/{course_id}/{relation}/bulk-remove")
+async def remove_many_from_course(course_id: str, relation: str, ids: List[str] = Body(...)):
+    if relation not in course_relationships:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await course_relationships[relation].unlink_many(course_id, ids)
+
 # Get all members of a course
 @router.get("/{course_id}/members")
 async def get_course_members(course_id: str):
-    course = await courses_collection.find_one({"_id": ObjectId(course_id)})
+    course = await courses_cache.get(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course.get("members", [])
@@ -63,6 +91,7 @@ async def get_course_members(course_id: str):
 @router.post("/{course_id}/members/{user_id}")
 async def add_member_to_course(course_id: str, user_id: str):
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$addToSet": {"members": user_id}})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Member added successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
@@ -71,6 +100,7 @@ async def add_member_to_course(course_id: str, user_id: str):
 @router.delete("/{course_id}/members/{user_id}")
 async def remove_member_from_course(course_id: str, user_id: str):
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$pull": {"members": user_id}})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Member removed successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
@@ -78,7 +108,7 @@ async def remove_member_from_course(course_id: str, user_id: str):
 # Get all documents of a course
 @router.get("/{course_id}/documents")
 async def get_course_documents(course_id: str):
-    course = await courses_collection.find_one({"_id": ObjectId(course_id)})
+    course = await courses_cache.get(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course.get("documents", [])
@@ -87,6 +117,7 @@ async def get_course_documents(course_id: str):
 @router.post("/{course_id}/documents/{document_id}")
 async def add_document_to_course(course_id: str, document_id: str):
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$addToSet": {"documents": document_id}})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Document added to course successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
@@ -95,6 +126,7 @@ async def add_document_to_course(course_id: str, document_id: str):
 @router.delete("/{course_id}/documents/{document_id}")
 async def remove_document_from_course(course_id: str, document_id: str):
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$pull": {"documents": document_id}})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Document removed from course successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
@@ -102,7 +134,7 @@ async def remove_document_from_course(course_id: str, document_id: str):
 # Get all notes of a course
 @router.get("/{course_id}/notes")
 async def get_course_notes(course_id: str):
-    course = await courses_collection.find_one({"_id": ObjectId(course_id)})
+    course = await courses_cache.get(course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course.get("notes", [])
@@ -111,6 +143,7 @@ async def get_course_notes(course_id: str):
 @router.post("/{course_id}/notes/{note_id}")
 async def add_note_to_course(course_id: str, note_id: str):
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$addToSet": {"notes": note_id}})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Note added to course successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
@@ -119,6 +152,7 @@ async def add_note_to_course(course_id: str, note_id: str):
 @router.delete("/{course_id}/notes/{note_id}")
 async def remove_note_from_course(course_id: str, note_id: str):
     result = await courses_collection.update_one({"_id": ObjectId(course_id)}, {"$pull": {"notes": note_id}})
+    courses_cache.invalidate(course_id)
     if result.matched_count:
         return {"message": "Note removed from course successfully"}
     raise HTTPException(status_code=404, detail="Course not found")
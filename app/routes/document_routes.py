@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.database import database
+from app.loaders import forget
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
 from app.models.document import Document
 from bson import ObjectId
 
@@ -19,19 +23,15 @@ async def create_document(document: Document):
 
 # Get all documents
 @router.get("/")
-async def get_documents():
-    documents = await documents_collection.find().to_list(100)
-    for document in documents:
-        document["_id"] = str(document["_id"])  # Convert ObjectId to string
-    return documents
+async def get_documents(page: PageParams = Depends()):
+    return await paginate(documents_collection, {}, page)
 
 # Get a single document by ID
 @router.get("/{document_id}")
 async def get_document(document_id: str):
     document = await documents_collection.find_one({"_id": ObjectId(document_id)})
     if document:
-        document["_id"] = str(document["_id"])
-        return document
+        return BSONResponse(document)
     raise HTTPException(status_code=404, detail="Document not found")
 
 # Update a document by ID
@@ -41,6 +41,7 @@ async def update_document(document_id: str, updated_document: Document):
     result = await documents_collection.update_one(
         {"_id": ObjectId(document_id)}, {"$set": document_dict}
     )
+    forget("documents", document_id)
     if result.matched_count:
         return {"message": "Document updated successfully"}
     raise HTTPException(status_code=404, detail="Document not found")
@@ -49,6 +50,7 @@ async def update_document(document_id: str, updated_document: Document):
 @router.delete("/{document_id}")
 async def delete_document(document_id: str):
     result = await documents_collection.delete_one({"_id": ObjectId(document_id)})
+    forget("documents", document_id)
     if result.deleted_count:
         return {"message": "Document deleted successfully"}
     raise HTTPException(status_code=404, detail="Document not found")
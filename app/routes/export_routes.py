@@ -0,0 +1,84 @@
+import zlib
+from typing import Optional
+
+from bson import ObjectId, json_util
+from bson.errors import InvalidId
+from bson.json_util import RELAXED_JSON_OPTIONS
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.database import database
+from app.dependencies import require_admin
+
+router = APIRouter(prefix="/export", tags=["Export"], dependencies=[Depends(require_admin)])
+
+# Colecciones exportables y la proyección de cada una (las contraseñas no salen)
+EXPORTS = {
+    "users": {"password": 0},
+    "tasks": None,
+    "documents": None,
+    "teams": None,
+    "kanban_boards": None,
+    "schedules": None,
+    "flashcard_decks": None,
+    "reminders": None,
+    "courses": None,
+    "friend_requests": None,
+    "notes": None,
+    "meetings": None,
+    "calculator": None,
+}
+
+
+async def ndjson_batches(collection, query, projection, batch_size):
+    # Un chunk por batch del cursor: la memoria no depende del tamaño de la colección
+    cursor = collection.find(query, projection).sort("_id", 1).batch_size(batch_size)
+    try:
+        lines = []
+        async for document in cursor:
+            lines.append(json_util.dumps(document, json_options=RELAXED_JSON_OPTIONS).encode())
+            if len(lines) == batch_size:
+                yield b"\n".join(lines) + b"\n"
+                lines = []
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+    finally:
+        # Si el cliente se desconecta, no dejar el cursor abierto en el servidor
+        await cursor.close()
+
+
+async def gzipped(chunks):
+    compressor = zlib.compressobj(wbits=31)  # formato gzip
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# Stream a whole collection as NDJSON (MongoDB relaxed extended JSON, one document per line),
+# in _id order. An interrupted export resumes with ?after=<last _id received>.
+@router.get("/{collection_name}")
+async def export_collection(
+    collection_name: str,
+    after: Optional[str] = Query(None, description="Only documents with a greater _id"),
+    gzip: bool = Query(False, description="Compress the stream with gzip"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000),
+):
+    if collection_name not in EXPORTS:
+        raise HTTPException(status_code=404, detail="Collection not exportable")
+    query = {}
+    if after is not None:
+        try:
+            query = {"_id": {"$gt": ObjectId(after)}}
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid 'after' id")
+
+    chunks = ndjson_batches(database[collection_name], query, EXPORTS[collection_name], batch_size or settings.export_batch_size)
+    filename, media_type = f"{collection_name}.ndjson", "application/x-ndjson"
+    if gzip:
+        # Se descarga como archivo .ndjson.gz, no como Content-Encoding del transporte
+        chunks = gzipped(chunks)
+        filename, media_type = filename + ".gz", "application/gzip"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
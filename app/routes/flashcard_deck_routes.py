@@ -1,5 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.database import database
+from app.loaders import forget
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
 from app.models.flashcardDeck import FlashcardDeck
 from bson import ObjectId
 
@@ -18,19 +22,15 @@ async def create_flashcard_deck(deck: FlashcardDeck):
 
 # Get all flashcard decks
 @router.get("/")
-async def get_flashcard_decks():
-    decks = await flashcard_decks_collection.find().to_list(100)
-    for deck in decks:
-        deck["_id"] = str(deck["_id"])
-    return decks
+async def get_flashcard_decks(page: PageParams = Depends()):
+    return await paginate(flashcard_decks_collection, {}, page)
 
 # Get a single flashcard deck by ID
 @router.get("/{deck_id}")
 async def get_flashcard_deck(deck_id: str):
     deck = await flashcard_decks_collection.find_one({"_id": ObjectId(deck_id)})
     if deck:
-        deck["_id"] = str(deck["_id"])
-        return deck
+        return BSONResponse(deck)
     raise HTTPException(status_code=404, detail="Flashcard deck not found")
 
 # Update a flashcard deck by ID
@@ -38,6 +38,7 @@ async def get_flashcard_deck(deck_id: str):
 async def update_flashcard_deck(deck_id: str, updated_deck: FlashcardDeck):
     deck_dict = updated_deck.model_dump(exclude_unset=True, by_alias=True)
     result = await flashcard_decks_collection.update_one({"_id": ObjectId(deck_id)}, {"$set": deck_dict})
+    forget("flashcard_decks", deck_id)
     if result.matched_count:
         return {"message": "Flashcard deck updated successfully"}
     raise HTTPException(status_code=404, detail="Flashcard deck not found")
@@ -46,6 +47,7 @@ async def update_flashcard_deck(deck_id: str, updated_deck: FlashcardDeck):
 @router.delete("/{deck_id}")
 async def delete_flashcard_deck(deck_id: str):
     result = await flashcard_decks_collection.delete_one({"_id": ObjectId(deck_id)})
+    forget("flashcard_decks", deck_id)
     if result.deleted_count:
         return {"message": "Flashcard deck deleted successfully"}
     raise HTTPException(status_code=404, detail="Flashcard deck not found")
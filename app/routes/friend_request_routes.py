@@ -1,5 +1,8 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.cache import users_cache
 from app.models.friendRequest import FriendRequest, FriendRequestStatus
 from bson import ObjectId
 import time
@@ -76,16 +79,11 @@ async def create_friend_request_by_email(request: dict):
 
 # Get pending requests for a user
 @router.get("/pending/{user_id}")
-async def get_pending_requests(user_id: str):
-    requests = await friend_requests_collection.find({
+async def get_pending_requests(user_id: str, page: PageParams = Depends()):
+    return await paginate(friend_requests_collection, {
         "receiver_id": user_id,
         "status": FriendRequestStatus.PENDING
-    }).to_list(100)
-
-    for request in requests:
-        request["_id"] = str(request["_id"])
-
-    return requests
+    }, page)
 
 # Accept a friend request
 @router.post("/{request_id}/accept")
@@ -109,11 +107,13 @@ async def accept_friend_request(request_id: str):
         {"_id": ObjectId(request["sender_id"])},
         {"$addToSet": {"friends": request["receiver_id"]}}
     )
+    users_cache.invalidate(request["sender_id"])
 
     await users_collection.update_one(
         {"_id": ObjectId(request["receiver_id"])},
         {"$addToSet": {"friends": request["sender_id"]}}
     )
+    users_cache.invalidate(request["receiver_id"])
 
     return {"message": "Friend request accepted"}
 
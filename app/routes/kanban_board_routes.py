@@ -1,5 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app.cache import kanban_boards_cache
+from app.loaders import loader
+from app.relationships import Relationship
 from app.models.kanbanBoard import KanbanBoard
 from bson import ObjectId
 
@@ -8,6 +14,10 @@ router = APIRouter(prefix="/kanban", tags=["Kanban Board"])
 kanban_collection = database["kanban_boards"]
 tasks_collection = database["tasks"]  # For checking task existence
 
+# Al añadir, la tarea entra en all_tasks y en open_tasks
+board_tasks = Relationship(kanban_collection, kanban_boards_cache, "all_tasks", lambda task_id: loader("tasks").load(task_id), "Kanban board", "Task",
+                           linked="Task already in board", also=("open_tasks",))
+
 # Create a new Kanban board
 @router.post("/", response_model=KanbanBoard)
 async def create_kanban_board(board: KanbanBoard):
@@ -18,57 +28,28 @@ async def create_kanban_board(board: KanbanBoard):
 
 # Get all Kanban boards
 @router.get("/")
-async def get_kanban_boards():
-    boards = await kanban_collection.find().to_list(100)
-    for board in boards:
-        board["_id"] = str(board["_id"])
-    return boards
+async def get_kanban_boards(page: PageParams = Depends()):
+    return await paginate(kanban_collection, {}, page)
 
 # Get a single Kanban board by ID
 @router.get("/{board_id}")
 async def get_kanban_board(board_id: str):
-    board = await kanban_collection.find_one({"_id": ObjectId(board_id)})
+    board = await kanban_boards_cache.get(board_id)
     if board:
-        board["_id"] = str(board["_id"])
-        return board
+        return BSONResponse(board)
     raise HTTPException(status_code=404, detail="Kanban board not found")
 
 # Add a task to the board
 @router.post("/{board_id}/tasks/{task_id}")
 async def add_task_to_board(board_id: str, task_id: str):
-    # Check if the task exists
-    task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Check if the board exists
-    board = await kanban_collection.find_one({"_id": ObjectId(board_id)})
-    if not board:
-        raise HTTPException(status_code=404, detail="Kanban board not found")
-
-    # Check if the task is already in the board
-    if task_id in board.get("all_tasks", []):
-        raise HTTPException(status_code=400, detail="Task already in board")
-
-    # Add task to all_tasks and open_tasks
-    result = await kanban_collection.update_one(
-        {"_id": ObjectId(board_id)},
-        {
-            "$push": {
-                "all_tasks": task_id,
-                "open_tasks": task_id
-            }
-        }
-    )
-
-    if result.modified_count:
-        return {"message": "Task added to board successfully"}
-    raise HTTPException(status_code=500, detail="Failed to add task to board")
+    await board_tasks.link(board_id, task_id)
+    return {"message": "Task added to board successfully"}
 
 # Delete a Kanban board by ID
 @router.delete("/{board_id}")
 async def delete_kanban_board(board_id: str):
     result = await kanban_collection.delete_one({"_id": ObjectId(board_id)})
+    kanban_boards_cache.invalidate(board_id)
     if result.deleted_count:
         return {"message": "Kanban board deleted successfully"}
     raise HTTPException(status_code=404, detail="Kanban board not found")
@@ -80,6 +61,7 @@ async def move_task_open_to_in_progress(board_id: str, task_id: str):
         {"_id": ObjectId(board_id)},
         {"$pull": {"open_tasks": task_id}, "$push": {"in_progress_tasks": task_id}}
     )
+    kanban_boards_cache.invalidate(board_id)
     if result.matched_count:
         return {"message": "Task moved to In Progress"}
     raise HTTPException(status_code=404, detail="Board or Task not found")
@@ -91,6 +73,7 @@ async def move_task_in_progress_to_in_review(board_id: str, task_id: str):
         {"_id": ObjectId(board_id)},
         {"$pull": {"in_progress_tasks": task_id}, "$push": {"in_review_tasks": task_id}}
     )
+    kanban_boards_cache.invalidate(board_id)
     if result.matched_count:
         return {"message": "Task moved to In Review"}
     raise HTTPException(status_code=404, detail="Board or Task not found")
@@ -102,6 +85,7 @@ async def move_task_in_review_to_closed(board_id: str, task_id: str):
         {"_id": ObjectId(board_id)},
         {"$pull": {"in_review_tasks": task_id}, "$push": {"closed_tasks": task_id}}
     )
+    kanban_boards_cache.invalidate(board_id)
     if result.matched_count:
         return {"message": "Task moved to Closed"}
     raise HTTPException(status_code=404, detail="Board or Task not found")
@@ -113,6 +97,7 @@ async def move_task_in_progress_to_closed(board_id: str, task_id: str):
         {"_id": ObjectId(board_id)},
         {"$pull": {"in_progress_tasks": task_id}, "$push": {"closed_tasks": task_id}}
     )
+    kanban_boards_cache.invalidate(board_id)
     if result.matched_count:
         return {"message": "Task moved directly to Closed"}
     raise HTTPException(status_code=404, detail="Board or Task not found")
@@ -133,6 +118,7 @@ async def remove_task_from_board(board_id: str, task_id: str):
             }
         }
     )
+    kanban_boards_cache.invalidate(board_id)
     if result.modified_count:
         return {"message": "Task removed from board successfully"}
     raise HTTPException(status_code=404, detail="Board or Task not found")
@@ -1,5 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends
 from app.database import database
+from app.loaders import forget
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app import bulk
+from app.cache import schedules_cache, users_cache
 from app.models.meeting import Meeting
 from bson import ObjectId
 
@@ -7,6 +14,7 @@ router = APIRouter(prefix="/meetings", tags=["Meetings"])
 
 meetings_collection = database["meetings"]
 users_collection = database["users"]  # For checking participants
+schedules_collection = database["schedules"]  # For attaching bulk-created meetings to a schedule
 
 # Create a new meeting
 @router.post("/", response_model=Meeting)
@@ -16,21 +24,27 @@ async def create_meeting(meeting: Meeting):
     meeting_dict["_id"] = str(result.inserted_id)
     return meeting_dict
 
+# Create many meetings at once, optionally adding them to a schedule
+@router.post("/bulk")
+async def create_meetings_bulk(meetings: List[dict] = Body(...), schedule_id: Optional[str] = None):
+    if schedule_id and not await schedules_cache.get(schedule_id):
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    result = await bulk.insert_many(meetings_collection, Meeting, meetings, "meeting_id")
+    if schedule_id:
+        await bulk.attach(schedules_collection, schedules_cache, schedule_id, "meetings", result)
+    return result
+
 # Get all meetings
 @router.get("/")
-async def get_meetings():
-    meetings = await meetings_collection.find().to_list(100)
-    for meeting in meetings:
-        meeting["_id"] = str(meeting["_id"])
-    return meetings
+async def get_meetings(page: PageParams = Depends()):
+    return await paginate(meetings_collection, {}, page, sort_fields=("start_time",))
 
 # Get a single meeting by ID
 @router.get("/{meeting_id}")
 async def get_meeting(meeting_id: str):
     meeting = await meetings_collection.find_one({"_id": ObjectId(meeting_id)})
     if meeting:
-        meeting["_id"] = str(meeting["_id"])
-        return meeting
+        return BSONResponse(meeting)
     raise HTTPException(status_code=404, detail="Meeting not found")
 
 # Update a meeting by ID
@@ -38,6 +52,7 @@ async def get_meeting(meeting_id: str):
 async def update_meeting(meeting_id: str, updated_meeting: Meeting):
     meeting_dict = updated_meeting.model_dump(exclude_unset=True, by_alias=True)
     result = await meetings_collection.update_one({"_id": ObjectId(meeting_id)}, {"$set": meeting_dict})
+    forget("meetings", meeting_id)
     if result.matched_count:
         return {"message": "Meeting updated successfully"}
     raise HTTPException(status_code=404, detail="Meeting not found")
@@ -46,6 +61,7 @@ async def update_meeting(meeting_id: str, updated_meeting: Meeting):
 @router.delete("/{meeting_id}")
 async def delete_meeting(meeting_id: str):
     result = await meetings_collection.delete_one({"_id": ObjectId(meeting_id)})
+    forget("meetings", meeting_id)
     if result.deleted_count:
         return {"message": "Meeting deleted successfully"}
     raise HTTPException(status_code=404, detail="Meeting not found")
@@ -62,6 +78,7 @@ async def get_meeting_participants(meeting_id: str):
 @router.post("/{meeting_id}/participants/{user_id}")
 async def add_participant(meeting_id: str, user_id: str):
     result = await meetings_collection.update_one({"_id": ObjectId(meeting_id)}, {"$addToSet": {"participants": user_id}})
+    forget("meetings", meeting_id)
     if result.matched_count:
         return {"message": "Participant added successfully"}
     raise HTTPException(status_code=404, detail="Meeting not found")
@@ -70,6 +87,7 @@ async def add_participant(meeting_id: str, user_id: str):
 @router.delete("/{meeting_id}/participants/{user_id}")
 async def remove_participant(meeting_id: str, user_id: str):
     result = await meetings_collection.update_one({"_id": ObjectId(meeting_id)}, {"$pull": {"participants": user_id}})
+    forget("meetings", meeting_id)
     if result.matched_count:
         return {"message": "Participant removed successfully"}
     raise HTTPException(status_code=404, detail="Meeting not found")
@@ -77,7 +95,7 @@ async def remove_participant(meeting_id: str, user_id: str):
 # Get user's kanban ID
 @router.get("/users/{user_id}/kanban")
 async def get_user_kanban(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if user:
         return {"kanban_id": user.get("kanban_id")}
     raise HTTPException(status_code=404, detail="User not found")
@@ -1,12 +1,20 @@
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends
 from app.database import database
+from app.loaders import forget
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app import bulk
+from app.cache import users_cache
 from app.models.note import Note
 from bson import ObjectId
-from datetime import datetime
+from datetime import datetime, timezone
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
 
 notes_collection = database["notes"]
+users_collection = database["users"]  # For attaching bulk-created notes to a user
 
 # Create a new note
 @router.post("/", response_model=Note)
@@ -18,21 +26,31 @@ async def create_note(note: Note):
     note_dict["_id"] = str(result.inserted_id)
     return note_dict
 
+def stamp_note(note_dict):
+    note_dict["created_date"] = datetime.now(timezone.utc)
+    note_dict["last_modified"] = datetime.now(timezone.utc)
+
+# Create many notes at once, optionally adding them to a user's notes
+@router.post("/bulk")
+async def create_notes_bulk(notes: List[dict] = Body(...), user_id: Optional[str] = None):
+    if user_id and not await users_cache.get(user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    result = await bulk.insert_many(notes_collection, Note, notes, "note_id", prepare=stamp_note)
+    if user_id:
+        await bulk.attach(users_collection, users_cache, user_id, "notes", result)
+    return result
+
 # Get all notes
 @router.get("/")
-async def get_notes():
-    notes = await notes_collection.find().to_list(100)
-    for note in notes:
-        note["_id"] = str(note["_id"])
-    return notes
+async def get_notes(page: PageParams = Depends()):
+    return await paginate(notes_collection, {}, page, sort_fields=("created_date",))
 
 # Get a single note by ID
 @router.get("/{note_id}")
 async def get_note(note_id: str):
     note = await notes_collection.find_one({"_id": ObjectId(note_id)})
     if note:
-        note["_id"] = str(note["_id"])
-        return note
+        return BSONResponse(note)
     raise HTTPException(status_code=404, detail="Note not found")
 
 # Update a note by ID
@@ -41,6 +59,7 @@ async def update_note(note_id: str, updated_note: Note):
     note_dict = updated_note.model_dump(exclude_unset=True, by_alias=True)
     note_dict["last_modified"] = datetime.utcnow()
     result = await notes_collection.update_one({"_id": ObjectId(note_id)}, {"$set": note_dict})
+    forget("notes", note_id)
     if result.matched_count:
         return {"message": "Note updated successfully"}
     raise HTTPException(status_code=404, detail="Note not found")
@@ -49,22 +68,17 @@ async def update_note(note_id: str, updated_note: Note):
 @router.delete("/{note_id}")
 async def delete_note(note_id: str):
     result = await notes_collection.delete_one({"_id": ObjectId(note_id)})
+    forget("notes", note_id)
     if result.deleted_count:
         return {"message": "Note deleted successfully"}
     raise HTTPException(status_code=404, detail="Note not found")
 
 # Get all notes by subject
 @router.get("/subject/{subject}")
-async def get_notes_by_subject(subject: str):
-    notes = await notes_collection.find({"subject": subject}).to_list(100)
-    for note in notes:
-        note["_id"] = str(note["_id"])
-    return notes
+async def get_notes_by_subject(subject: str, page: PageParams = Depends()):
+    return await paginate(notes_collection, {"subject": subject}, page)
 
 # Get all notes by tag
 @router.get("/tag/{tag}")
-async def get_notes_by_tag(tag: str):
-    notes = await notes_collection.find({"tags": tag}).to_list(100)
-    for note in notes:
-        note["_id"] = str(note["_id"])
-    return notes
+async def get_notes_by_tag(tag: str, page: PageParams = Depends()):
+    return await paginate(notes_collection, {"tags": tag}, page)
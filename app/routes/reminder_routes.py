@@ -1,5 +1,10 @@
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, Body, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app import bulk
 from app.models.reminder import Reminder
 from bson import ObjectId
 
@@ -15,21 +20,22 @@ async def create_reminder(reminder: Reminder):
     reminder_dict["_id"] = str(result.inserted_id)
     return reminder_dict
 
+# Create many reminders at once (each one already names its user_id)
+@router.post("/bulk")
+async def create_reminders_bulk(reminders: List[dict] = Body(...)):
+    return await bulk.insert_many(reminders_collection, Reminder, reminders, "reminder_id")
+
 # Get all reminders
 @router.get("/")
-async def get_reminders():
-    reminders = await reminders_collection.find().to_list(100)
-    for reminder in reminders:
-        reminder["_id"] = str(reminder["_id"])
-    return reminders
+async def get_reminders(page: PageParams = Depends()):
+    return await paginate(reminders_collection, {}, page)
 
 # Get a single reminder by ID
 @router.get("/{reminder_id}")
 async def get_reminder(reminder_id: str):
     reminder = await reminders_collection.find_one({"_id": ObjectId(reminder_id)})
     if reminder:
-        reminder["_id"] = str(reminder["_id"])
-        return reminder
+        return BSONResponse(reminder)
     raise HTTPException(status_code=404, detail="Reminder not found")
 
 # Update a reminder by ID
@@ -51,24 +57,15 @@ async def delete_reminder(reminder_id: str):
 
 # Get all reminders for a specific user
 @router.get("/user/{user_id}")
-async def get_reminders_for_user(user_id: str):
-    reminders = await reminders_collection.find({"user_id": user_id}).to_list(100)
-    for reminder in reminders:
-        reminder["_id"] = str(reminder["_id"])
-    return reminders
+async def get_reminders_for_user(user_id: str, page: PageParams = Depends()):
+    return await paginate(reminders_collection, {"user_id": user_id}, page, sort_fields=("remind_at",))
 
 # Get all reminders for a specific task
 @router.get("/task/{task_id}")
-async def get_reminders_for_task(task_id: str):
-    reminders = await reminders_collection.find({"entity_id": task_id, "entity_type": "task"}).to_list(100)
-    for reminder in reminders:
-        reminder["_id"] = str(reminder["_id"])
-    return reminders
+async def get_reminders_for_task(task_id: str, page: PageParams = Depends()):
+    return await paginate(reminders_collection, {"entity_id": task_id, "entity_type": "task"}, page)
 
 # Get all reminders for a specific meeting
 @router.get("/meeting/{meeting_id}")
-async def get_reminders_for_meeting(meeting_id: str):
-    reminders = await reminders_collection.find({"entity_id": meeting_id, "entity_type": "meeting"}).to_list(100)
-    for reminder in reminders:
-        reminder["_id"] = str(reminder["_id"])
-    return reminders
+async def get_reminders_for_meeting(meeting_id: str, page: PageParams = Depends()):
+    return await paginate(reminders_collection, {"entity_id": meeting_id, "entity_type": "meeting"}, page)
@@ -1,5 +1,11 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app.cache import users_cache, schedules_cache
+from app.loaders import loader
+from app.relationships import Relationship
 from app.models.schedule import Schedule
 from bson import ObjectId
 
@@ -9,11 +15,13 @@ schedules_collection = database["schedules"]
 users_collection = database["users"]  # For user validation
 meetings_collection = database["meetings"]  # For meeting validation
 
+schedule_meetings = Relationship(schedules_collection, schedules_cache, "meetings", lambda meeting_id: loader("meetings").load(meeting_id), "Schedule", "Meeting")
+
 # Create a new schedule
 @router.post("/", response_model=Schedule)
 async def create_schedule(schedule: Schedule):
     # Ensure the user exists
-    user = await users_collection.find_one({"_id": ObjectId(schedule.user_id)})
+    user = await users_cache.get(schedule.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -29,19 +37,15 @@ async def create_schedule(schedule: Schedule):
 
 # Get all schedules
 @router.get("/")
-async def get_schedules():
-    schedules = await schedules_collection.find().to_list(100)
-    for schedule in schedules:
-        schedule["_id"] = str(schedule["_id"])
-    return schedules
+async def get_schedules(page: PageParams = Depends()):
+    return await paginate(schedules_collection, {}, page)
 
 # Get a schedule by ID
 @router.get("/{schedule_id}")
 async def get_schedule(schedule_id: str):
-    schedule = await schedules_collection.find_one({"_id": ObjectId(schedule_id)})
+    schedule = await schedules_cache.get(schedule_id)
     if schedule:
-        schedule["_id"] = str(schedule["_id"])
-        return schedule
+        return BSONResponse(schedule)
     raise HTTPException(status_code=404, detail="Schedule not found")
 
 # Update a schedule
@@ -49,6 +53,7 @@ async def get_schedule(schedule_id: str):
 async def update_schedule(schedule_id: str, updated_schedule: Schedule):
     schedule_dict = updated_schedule.model_dump(exclude_unset=True, by_alias=True)
     result = await schedules_collection.update_one({"_id": ObjectId(schedule_id)}, {"$set": schedule_dict})
+    schedules_cache.invalidate(schedule_id)
     if result.matched_count:
         return {"message": "Schedule updated successfully"}
     raise HTTPException(status_code=404, detail="Schedule not found")
@@ -57,6 +62,7 @@ async def update_schedule(schedule_id: str, updated_schedule: Schedule):
 @router.delete("/{schedule_id}")
 async def delete_schedule(schedule_id: str):
     result = await schedules_collection.delete_one({"_id": ObjectId(schedule_id)})
+    schedules_cache.invalidate(schedule_id)
     if result.deleted_count:
         return {"message": "Schedule deleted successfully"}
     raise HTTPException(status_code=404, detail="Schedule not found")
@@ -64,7 +70,7 @@ async def delete_schedule(schedule_id: str):
 # Get all meetings in a schedule
 @router.get("/{schedule_id}/meetings")
 async def get_schedule_meetings(schedule_id: str):
-    schedule = await schedules_collection.find_one({"_id": ObjectId(schedule_id)})
+    schedule = await schedules_cache.get(schedule_id)
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
     return schedule.get("meetings", [])
@@ -72,38 +78,19 @@ async def get_schedule_meetings(schedule_id: str):
 # Add a meeting to a schedule
 @router.post("/{schedule_id}/meetings/{meeting_id}")
 async def add_meeting_to_schedule(schedule_id: str, meeting_id: str):
-    # Ensure schedule exists
-    schedule = await schedules_collection.find_one({"_id": ObjectId(schedule_id)})
-    if not schedule:
-        raise HTTPException(status_code=404, detail="Schedule not found")
-
-    # Ensure meeting exists
-    meeting = await meetings_collection.find_one({"_id": ObjectId(meeting_id)})
-    if not meeting:
-        raise HTTPException(status_code=404, detail="Meeting not found")
-
-    # Add meeting to the schedule
-    result = await schedules_collection.update_one(
-        {"_id": ObjectId(schedule_id)},
-        {"$addToSet": {"meetings": meeting_id}}
-    )
-    if result.matched_count:
-        return {"message": "Meeting added to schedule successfully"}
-    raise HTTPException(status_code=404, detail="Schedule not found")
+    # Ya estar en el horario no es un error
+    await schedule_meetings.link(schedule_id, meeting_id)
+    return {"message": "Meeting added to schedule successfully"}
 
 # Remove a meeting from a schedule
 @router.delete("/{schedule_id}/meetings/{meeting_id}")
 async def remove_meeting_from_schedule(schedule_id: str, meeting_id: str):
-    # Ensure schedule exists
-    schedule = await schedules_collection.find_one({"_id": ObjectId(schedule_id)})
-    if not schedule:
-        raise HTTPException(status_code=404, detail="Schedule not found")
-
     # Remove the meeting from the schedule
     result = await schedules_collection.update_one(
         {"_id": ObjectId(schedule_id)},
         {"$pull": {"meetings": meeting_id}}
     )
+    schedules_cache.invalidate(schedule_id)
     if result.matched_count:
         return {"message": "Meeting removed from schedule successfully"}
     raise HTTPException(status_code=404, detail="Schedule not found")
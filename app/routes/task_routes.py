@@ -1,6 +1,13 @@
 #File for API endpoints
-from fastapi import APIRouter, HTTPException
+from typing import List, Optional
+from fastapi import APIRouter, Body, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app import bulk
+from app.cache import teams_cache, users_cache
+from app.loaders import forget, loader
 from app.models.task import Task
 from bson import ObjectId
 
@@ -9,6 +16,7 @@ router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
 tasks_collection = database["tasks"]  # Reference to the "tasks" collection
 users_collection = database["users"]  # Reference to the "users" collection
+teams_collection = database["teams"]  # For attaching bulk-created tasks to a backlog
 
 # Create a new task
 @router.post("/", response_model=Task)
@@ -20,21 +28,31 @@ async def create_task(task: Task):
     task_dict["_id"] = str(result.inserted_id)
     return task_dict
 
+# Create many tasks at once, optionally adding them to a user's tasks and/or a team's backlog
+@router.post("/bulk")
+async def create_tasks_bulk(tasks: List[dict] = Body(...), user_id: Optional[str] = None, team_id: Optional[str] = None):
+    if user_id and not await users_cache.get(user_id):
+        raise HTTPException(status_code=404, detail="User not found")
+    if team_id and not await teams_cache.get(team_id):
+        raise HTTPException(status_code=404, detail="Team not found")
+    result = await bulk.insert_many(tasks_collection, Task, tasks, "task_id")
+    if user_id:
+        await bulk.attach(users_collection, users_cache, user_id, "tasks", result)
+    if team_id:
+        await bulk.attach(teams_collection, teams_cache, team_id, "backlog", result)
+    return result
+
 # Get all tasks
 @router.get("/")
-async def get_tasks():
-    tasks = await tasks_collection.find().to_list(100)
-    for task in tasks:
-        task["_id"] = str(task["_id"]) # Convert ObjectId to string
-    return tasks
+async def get_tasks(page: PageParams = Depends()):
+    return await paginate(tasks_collection, {}, page, sort_fields=("due_date",))
 
 # Get a single task by ID
 @router.get("/{task_id}")
 async def get_task(task_id: str):
     task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
     if task:
-        task["_id"] = str(task["_id"])
-        return task
+        return BSONResponse(task)
     raise HTTPException(status_code=404, detail="Task not found")
 
 # Update a task by ID
@@ -44,6 +62,7 @@ async def update_task(task_id: str, updated_task: Task):
     result = await tasks_collection.update_one(
         {"_id": ObjectId(task_id)}, {"$set": task_dict}
     )
+    forget("tasks", task_id)
     if result.matched_count:
         return {"message": "Task updated successfully"}
     raise HTTPException(status_code=404, detail="Task not found")
@@ -52,6 +71,7 @@ async def update_task(task_id: str, updated_task: Task):
 @router.delete("/{task_id}")
 async def delete_task(task_id: str):
     result = await tasks_collection.delete_one({"_id": ObjectId(task_id)})
+    forget("tasks", task_id)
     if result.deleted_count:
         return {"message": "Task deleted successfully"}
     raise HTTPException(status_code=404, detail="Task not found")
@@ -59,12 +79,12 @@ async def delete_task(task_id: str):
 @router.put("/{task_id}/assign/{user_id}")
 async def assign_task_to_user(task_id: str, user_id: str):
     # Check if the user exists
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Check if the task exists
-    task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
+    task = await loader("tasks").load(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
 
@@ -73,6 +93,7 @@ async def assign_task_to_user(task_id: str, user_id: str):
         {"_id": ObjectId(task_id)},
         {"$set": {"assignee_id": user_id}}
     )
+    forget("tasks", task_id)
 
     # Add the task to the user's task list if not already there
     if task_id not in user.get("tasks", []):
@@ -80,14 +101,17 @@ async def assign_task_to_user(task_id: str, user_id: str):
             {"_id": ObjectId(user_id)},
             {"$addToSet": {"tasks": task_id}}
         )
+        users_cache.invalidate(user_id)
 
     return {"message": "Task assigned to user successfully"}
 
 # Get task priority distribution by team
 @router.get("/priority-distribution")
 async def get_task_priority_distribution():
-    # Get all tasks
-    tasks = await tasks_collection.find().to_list(100)
+    # Count all tasks by priority in the database instead of loading them
+    counts = await tasks_collection.aggregate([
+        {"$group": {"_id": {"$ifNull": ["$priority", "medium"]}, "count": {"$sum": 1}}}  # Default to medium if not specified
+    ]).to_list(None)
     
     # Initialize distribution dictionary
     distribution = {
@@ -96,10 +120,8 @@ async def get_task_priority_distribution():
         "high": 0
     }
     
-    # Count tasks by priority
-    for task in tasks:
-        priority = task.get("priority", "medium")  # Default to medium if not specified
-        distribution[priority] += 1
+    for row in counts:
+        distribution[row["_id"]] += row["count"]
     
     # Calculate percentages
     total_tasks = sum(distribution.values())
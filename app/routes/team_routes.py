@@ -1,5 +1,12 @@
-from fastapi import APIRouter, HTTPException
+from typing import List
+from fastapi import APIRouter, Body, HTTPException, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app.cache import teams_cache, users_cache
+from app.loaders import loader
+from app.relationships import Relationship
 from app.models.team import Team
 from bson import ObjectId
 
@@ -11,6 +18,13 @@ users_collection = database["users"]  # For checking members
 tasks_collection = database["tasks"]  # For checking tasks
 documents_collection = database["documents"]  # For checking documents
 
+# Listas del equipo para los endpoints /bulk; path -> campo (tasks -> backlog)
+team_relationships = {
+    "members": Relationship(teams_collection, teams_cache, "members", users_cache.get, "Team", "User", targets=users_collection),
+    "tasks": Relationship(teams_collection, teams_cache, "backlog", lambda task_id: loader("tasks").load(task_id), "Team", "Task", targets=tasks_collection),
+    "documents": Relationship(teams_collection, teams_cache, "documents", lambda document_id: loader("documents").load(document_id), "Team", "Document", targets=documents_collection),
+}
+
 # Create a new team
 @router.post("/", response_model=Team)
 async def create_team(team: Team):
@@ -21,19 +35,15 @@ async def create_team(team: Team):
 
 # Get all teams
 @router.get("/")
-async def get_teams():
-    teams = await teams_collection.find().to_list(100)
-    for team in teams:
-        team["_id"] = str(team["_id"])
-    return teams
+async def get_teams(page: PageParams = Depends()):
+    return await paginate(teams_collection, {}, page)
 
 # Get a single team by ID
 @router.get("/{team_id}")
 async def get_team(team_id: str):
-    team = await teams_collection.find_one({"_id": ObjectId(team_id)})
+    team = await teams_cache.get(team_id)
     if team:
-        team["_id"] = str(team["_id"])
-        return team
+        return BSONResponse(team)
     raise HTTPException(status_code=404, detail="Team not found")
 
 # Update a team by ID
@@ -41,6 +51,7 @@ async def get_team(team_id: str):
 async def update_team(team_id: str, updated_team: Team):
     team_dict = updated_team.model_dump(exclude_unset=True, by_alias=True)
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$set": team_dict})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Team updated successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
@@ -49,14 +60,30 @@ async def update_team(team_id: str, updated_team: Team):
 @router.delete("/{team_id}")
 async def delete_team(team_id: str):
     result = await teams_collection.delete_one({"_id": ObjectId(team_id)})
+    teams_cache.invalidate(team_id)
     if result.deleted_count:
         return {"message": "Team deleted successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
 
+# Add many members, tasks or documents to a team at once
+# (declared before /{team_id}/{relation}/{id}, which would take "bulk" as an id)
+@router.post("/{team_id}/{relation}/bulk")
+async def add_many_to_team(team_id: str, relation: str, ids: List[str] = Body(...)):
+    if relation not in team_relationships:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await team_relationships[relation].link_many(team_id, ids)
+
+# Remove many members, tasks or documents from a team at once
+@router.post("/{team_id}/{relation}/bulk-remove")
+async def remove_many_from_team(team_id: str, relation: str, ids: List[str] = Body(...)):
+    if relation not in team_relationships:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await team_relationships[relation].unlink_many(team_id, ids)
+
 # Get all members of a team
 @router.get("/{team_id}/members")
 async def get_team_members(team_id: str):
-    team = await teams_collection.find_one({"_id": ObjectId(team_id)})
+    team = await teams_cache.get(team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team.get("members", [])
@@ -65,6 +92,7 @@ async def get_team_members(team_id: str):
 @router.post("/{team_id}/members/{user_id}")
 async def add_member(team_id: str, user_id: str):
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$addToSet": {"members": user_id}})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Member added successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
@@ -73,6 +101,7 @@ async def add_member(team_id: str, user_id: str):
 @router.delete("/{team_id}/members/{user_id}")
 async def remove_member(team_id: str, user_id: str):
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$pull": {"members": user_id}})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Member removed successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
@@ -80,7 +109,7 @@ async def remove_member(team_id: str, user_id: str):
 # Get all tasks in the backlog
 @router.get("/{team_id}/tasks")
 async def get_team_tasks(team_id: str):
-    team = await teams_collection.find_one({"_id": ObjectId(team_id)})
+    team = await teams_cache.get(team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team.get("backlog", [])
@@ -89,6 +118,7 @@ async def get_team_tasks(team_id: str):
 @router.post("/{team_id}/tasks/{task_id}")
 async def add_task_to_team(team_id: str, task_id: str):
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$addToSet": {"backlog": task_id}})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Task added to backlog successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
@@ -97,6 +127,7 @@ async def add_task_to_team(team_id: str, task_id: str):
 @router.delete("/{team_id}/tasks/{task_id}")
 async def remove_task_from_team(team_id: str, task_id: str):
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$pull": {"backlog": task_id}})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Task removed from backlog successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
@@ -104,7 +135,7 @@ async def remove_task_from_team(team_id: str, task_id: str):
 # Get all documents of a team
 @router.get("/{team_id}/documents")
 async def get_team_documents(team_id: str):
-    team = await teams_collection.find_one({"_id": ObjectId(team_id)})
+    team = await teams_cache.get(team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team.get("documents", [])
@@ -113,6 +144,7 @@ async def get_team_documents(team_id: str):
 @router.post("/{team_id}/documents/{document_id}")
 async def add_document_to_team(team_id: str, document_id: str):
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$addToSet": {"documents": document_id}})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Document added to team successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
@@ -121,6 +153,7 @@ async def add_document_to_team(team_id: str, document_id: str):
 @router.delete("/{team_id}/documents/{document_id}")
 async def remove_document_from_team(team_id: str, document_id: str):
     result = await teams_collection.update_one({"_id": ObjectId(team_id)}, {"$pull": {"documents": document_id}})
+    teams_cache.invalidate(team_id)
     if result.matched_count:
         return {"message": "Document removed from team successfully"}
     raise HTTPException(status_code=404, detail="Team not found")
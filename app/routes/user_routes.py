@@ -1,8 +1,16 @@
 import uuid
 import logging
 
-from fastapi import APIRouter, HTTPException, Path
+from typing import List
+
+from fastapi import APIRouter, Body, HTTPException, Path, Depends
 from app.database import database
+from app.dependencies import PageParams
+from app.pagination import paginate
+from app.responses import BSONResponse
+from app.cache import users_cache, teams_cache, courses_cache
+from app.loaders import loader
+from app.relationships import Relationship
 from app.models.user import User, LoginCredentials, RegisterCredentials, Location
 from bson import ObjectId
 from app.models.schedule import Schedule  # Asegúrate de que el modelo Schedule esté importado
@@ -20,6 +28,32 @@ notes_collection = database["notes"]  # Reference to notes collection for fetchi
 schedules_collection = database["schedules"]  # Reference to schedules collection for fetching user's schedules
 kanban_collection = database["kanban_boards"]  # Agregar esta línea junto con las otras colecciones
 
+# Listas de ids del usuario: comprobación y escritura en una sola operación (ver app.relationships)
+user_tasks = Relationship(users_collection, users_cache, "tasks", lambda task_id: loader("tasks").load(task_id), "User", "Task",
+                          linked="Task already assigned to user", not_linked="Task not assigned to user", targets=tasks_collection)
+user_documents = Relationship(users_collection, users_cache, "documents", lambda document_id: loader("documents").load(document_id), "User", "Document",
+                              linked="Document already assigned to user", not_linked="Document not assigned to user", targets=documents_collection,
+                              link_missing="document not found")
+user_teams = Relationship(users_collection, users_cache, "teams", teams_cache.get, "User", "Team",
+                          linked="Team already assigned to user", not_linked="Team not assigned to user", targets=teams_collection)
+user_friends = Relationship(users_collection, users_cache, "friends", users_cache.get, "User", "Friend",
+                            linked="Friend already added to user", not_linked="Friend not added to user", targets=users_collection)
+user_flashcard_decks = Relationship(users_collection, users_cache, "flashcard_decks", lambda deck_id: loader("flashcard_decks").load(deck_id), "User", "Flashcard deck",
+                                    linked="Flashcard deck already assigned to user", not_linked="Flashcard deck not assigned to user", targets=flashcard_decks_collection)
+user_courses = Relationship(users_collection, users_cache, "courses", courses_cache.get, "User", "Course",
+                            linked="Course already assigned to user", not_linked="Course not assigned to user", targets=courses_collection)
+user_notes = Relationship(users_collection, users_cache, "notes", lambda note_id: loader("notes").load(note_id), "User", "Note",
+                          linked="Note already assigned to user", not_linked="Note not assigned to user", targets=notes_collection)
+user_relationships = {
+    "tasks": user_tasks,
+    "documents": user_documents,
+    "teams": user_teams,
+    "friends": user_friends,
+    "flashcard_decks": user_flashcard_decks,
+    "courses": user_courses,
+    "notes": user_notes,
+}
+
 # Generate user flashcards
 import flashcards as fc
 @router.get("/{user_id}/{subject:path}/flash")
@@ -27,13 +61,12 @@ async def get_flashcards(
     user_id: str,
     subject: str = Path(..., title="Subject", description="El subject que puede contener barras")
 ):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     note_ids = user.get("notes", [])
-    object_ids = [ObjectId(note_id) for note_id in note_ids]
-    notes = await notes_collection.find({"_id": {"$in": object_ids}}).to_list(100)
+    notes = await loader("notes").load_many(note_ids)
 
     info = ''
     for note in notes:
@@ -53,19 +86,15 @@ async def create_user(user: User):
 
 # Get all users
 @router.get("/")
-async def get_users():
-    users = await users_collection.find().to_list(100)
-    for user in users:
-        user["_id"] = str(user["_id"])  # Convert ObjectId to string
-    return users
+async def get_users(page: PageParams = Depends()):
+    return await paginate(users_collection, {}, page)
 
 # Get a single user by ID
 @router.get("/{user_id}")
 async def get_user(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if user:
-        user["_id"] = str(user["_id"])
-        return user
+        return BSONResponse(user)
     raise HTTPException(status_code=404, detail="User not found")
 
 # Update a user by ID
@@ -75,6 +104,7 @@ async def update_user(user_id: str, updated_user: User):
     result = await users_collection.update_one(
         {"_id": ObjectId(user_id)}, {"$set": user_dict}
     )
+    users_cache.invalidate(user_id)
     if result.matched_count:
         return {"message": "User updated successfully"}
     raise HTTPException(status_code=404, detail="User not found")
@@ -83,442 +113,198 @@ async def update_user(user_id: str, updated_user: User):
 @router.delete("/{user_id}")
 async def delete_user(user_id: str):
     result = await users_collection.delete_one({"_id": ObjectId(user_id)})
+    users_cache.invalidate(user_id)
     if result.deleted_count:
         return {"message": "User deleted successfully"}
     raise HTTPException(status_code=404, detail="User not found")
 
+# Add many tasks/documents/teams/friends/... to a user at once
+# (declared before /{user_id}/{relation}/{id}, which would take "bulk" as an id)
+@router.post("/{user_id}/{relation}/bulk")
+async def add_many_to_user(user_id: str, relation: str, ids: List[str] = Body(...)):
+    if relation not in user_relationships:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await user_relationships[relation].link_many(user_id, ids)
+
+# Remove many tasks/documents/teams/friends/... from a user at once
+@router.post("/{user_id}/{relation}/bulk-remove")
+async def remove_many_from_user(user_id: str, relation: str, ids: List[str] = Body(...)):
+    if relation not in user_relationships:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return await user_relationships[relation].unlink_many(user_id, ids)
+
 # Get all tasks for a specific user
 @router.get("/{user_id}/tasks")
 async def get_user_tasks(user_id: str):
     # Fetch the user document
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Get the user's list of task IDs (if they exist)
     task_ids = user.get("tasks", [])
 
-    # Convert task ID strings to ObjectId for MongoDB query
-    object_ids = [ObjectId(task_id) for task_id in task_ids]
-
     # Fetch tasks that match those IDs
-    tasks = await tasks_collection.find({"_id": {"$in": object_ids}}).to_list(100)
-
-    # Convert ObjectId to string for API response
-    for task in tasks:
-        task["_id"] = str(task["_id"])
+    tasks = await loader("tasks").load_many(task_ids)
 
-    return tasks
+    return BSONResponse(tasks)
 
 # Add a task to a user
 @router.post("/{user_id}/tasks/{task_id}")
 async def add_task_to_user(user_id: str, task_id: str):
-    # Check if the user exists
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Check if the task exists
-    task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Check if the task is already in the user's task list
-    if task_id in user.get("tasks", []):
-        raise HTTPException(status_code=400, detail="Task already assigned to user")
-
-    # Add task to user's task list
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"tasks": task_id}}
-    )
-
+    await user_tasks.link(user_id, task_id)
     return {"message": "Task added to user successfully"}
 
 @router.delete("/{user_id}/tasks/{task_id}")
 async def remove_task_from_user(user_id: str, task_id: str):
-    # Check if the user exists
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Check if the task exists
-    task = await tasks_collection.find_one({"_id": ObjectId(task_id)})
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-
-    # Check if the task is in the user's task list
-    if task_id not in user.get("tasks", []):
-        raise HTTPException(status_code=400, detail="Task not assigned to user")
-
-    # Remove the task from the user's task list
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"tasks": task_id}}
-    )
-
+    await user_tasks.unlink(user_id, task_id)
     return {"message": "Task removed from user successfully"}
 
 # Get all documents for a specific user
 @router.get("/{user_id}/documents")
 async def get_user_docs(user_id: str):
     # Fetch the user document
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Get the user's list of docs IDs (if they exist)
     docs_ids = user.get("documents", [])
 
-    # Convert doc ID strings to ObjectId for MongoDB query
-    object_ids = [ObjectId(document_id) for document_id in docs_ids]
-
     # Fetch docs that match those IDs
-    docs = await documents_collection.find({"_id": {"$in": object_ids}}).to_list(100)
-
-    # Convert ObjectId to string for API response
-    for doc in docs:
-        doc["_id"] = str(doc["_id"])
+    docs = await loader("documents").load_many(docs_ids)
 
-    return docs
+    return BSONResponse(docs)
 
 # Add a doc to a user
 @router.post("/{user_id}/documents/{document_id}")
 async def add_document_to_user(user_id: str, document_id: str):
-    # Check if the user exists
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Check if the document exists
-    document = await documents_collection.find_one({"_id": ObjectId(document_id)})
-    if not document:
-        raise HTTPException(status_code=404, detail="document not found")
-
-    # Check if the document is already in the user's document list
-    if document_id in user.get("documents", []):
-        raise HTTPException(status_code=400, detail="Document already assigned to user")
-
-    # Add document to user's document list
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"documents": document_id}}
-    )
-
+    await user_documents.link(user_id, document_id)
     return {"message": "Document added to user successfully"}
 
 @router.delete("/{user_id}/documents/{document_id}")
 async def remove_document_from_user(user_id: str, document_id: str):
-    # Check if the user exists
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    # Check if the document exists
-    document = await documents_collection.find_one({"_id": ObjectId(document_id)})
-    if not document:
-        raise HTTPException(status_code=404, detail="Document not found")
-
-    # Check if the document is in the user's document list
-    if document_id not in user.get("documents", []):
-        raise HTTPException(status_code=400, detail="Document not assigned to user")
-
-    # Remove the document from the user's document list
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"documents": document_id}}
-    )
-
+    await user_documents.unlink(user_id, document_id)
     return {"message": "Document removed from user successfully"}
 
 # Get all teams for a specific user
 @router.get("/{user_id}/teams")
 async def get_user_teams(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     team_ids = user.get("teams", [])
-    object_ids = [ObjectId(team_id) for team_id in team_ids]
-    teams = await teams_collection.find({"_id": {"$in": object_ids}}).to_list(100)
+    teams = await loader("teams").load_many(team_ids)
 
-    for team in teams:
-        team["_id"] = str(team["_id"])
-
-    return teams
+    return BSONResponse(teams)
 
 # Add a team to a user
 @router.post("/{user_id}/teams/{team_id}")
 async def add_team_to_user(user_id: str, team_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    team = await teams_collection.find_one({"_id": ObjectId(team_id)})
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-
-    if team_id in user.get("teams", []):
-        raise HTTPException(status_code=400, detail="Team already assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"teams": team_id}}
-    )
-
+    await user_teams.link(user_id, team_id)
     return {"message": "Team added to user successfully"}
 
 # Remove a team from a user
 @router.delete("/{user_id}/teams/{team_id}")
 async def remove_team_from_user(user_id: str, team_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    team = await teams_collection.find_one({"_id": ObjectId(team_id)})
-    if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
-
-    if team_id not in user.get("teams", []):
-        raise HTTPException(status_code=400, detail="Team not assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"teams": team_id}}
-    )
-
+    await user_teams.unlink(user_id, team_id)
     return {"message": "Team removed from user successfully"}
 
 # Get all friends for a specific user
 @router.get("/{user_id}/friends")
 async def get_user_friends(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     friend_ids = user.get("friends", [])
-    object_ids = [ObjectId(friend_id) for friend_id in friend_ids]
-    friends = await users_collection.find({"_id": {"$in": object_ids}}).to_list(100)
-
-    for friend in friends:
-        friend["_id"] = str(friend["_id"])
+    friends = await loader("users").load_many(friend_ids)
 
-    return friends
+    return BSONResponse(friends)
 
 # Add a friend to a user
 @router.post("/{user_id}/friends/{friend_id}")
 async def add_friend_to_user(user_id: str, friend_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    friend = await users_collection.find_one({"_id": ObjectId(friend_id)})
-    if not friend:
-        raise HTTPException(status_code=404, detail="Friend not found")
-
-    if friend_id in user.get("friends", []):
-        raise HTTPException(status_code=400, detail="Friend already added to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"friends": friend_id}}
-    )
-
+    await user_friends.link(user_id, friend_id)
     return {"message": "Friend added to user successfully"}
 
 # Remove a friend from a user
 @router.delete("/{user_id}/friends/{friend_id}")
 async def remove_friend_from_user(user_id: str, friend_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    friend = await users_collection.find_one({"_id": ObjectId(friend_id)})
-    if not friend:
-        raise HTTPException(status_code=404, detail="Friend not found")
-
-    if friend_id not in user.get("friends", []):
-        raise HTTPException(status_code=400, detail="Friend not added to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"friends": friend_id}}
-    )
-
+    await user_friends.unlink(user_id, friend_id)
     return {"message": "Friend removed from user successfully"}
 
 # Get all flashcard decks for a specific user
 @router.get("/{user_id}/flashcard_decks")
 async def get_user_flashcard_decks(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     deck_ids = user.get("flashcard_decks", [])
-    object_ids = [ObjectId(deck_id) for deck_id in deck_ids]
-    flashcard_decks = await flashcard_decks_collection.find({"_id": {"$in": object_ids}}).to_list(100)
+    flashcard_decks = await loader("flashcard_decks").load_many(deck_ids)
 
-    for deck in flashcard_decks:
-        deck["_id"] = str(deck["_id"])
-
-    return
+    return BSONResponse(flashcard_decks)
 
 # Add a flashcard deck to a user
 @router.post("/{user_id}/flashcard_decks/{deck_id}")
 async def add_flashcard_deck_to_user(user_id: str, deck_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    deck = await flashcard_decks_collection.find_one({"_id": ObjectId(deck_id)})
-    if not deck:
-        raise HTTPException(status_code=404, detail="Flashcard deck not found")
-
-    if deck_id in user.get("flashcard_decks", []):
-        raise HTTPException(status_code=400, detail="Flashcard deck already assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"flashcard_decks": deck_id}}
-    )
-
+    await user_flashcard_decks.link(user_id, deck_id)
     return {"message": "Flashcard deck added to user successfully"}
 
 # Remove a flashcard deck from a user
 @router.delete("/{user_id}/flashcard_decks/{deck_id}")
 async def remove_flashcard_deck_from_user(user_id: str, deck_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    deck = await flashcard_decks_collection.find_one({"_id": ObjectId(deck_id)})
-    if not deck:
-        raise HTTPException(status_code=404, detail="Flashcard deck not found")
-
-    if deck_id not in user.get("flashcard_decks", []):
-        raise HTTPException(status_code=400, detail="Flashcard deck not assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"flashcard_decks": deck_id}}
-    )
-
+    await user_flashcard_decks.unlink(user_id, deck_id)
     return {"message": "Flashcard deck removed from user successfully"}
 
 # Get all courses for a specific user
 @router.get("/{user_id}/courses")
 async def get_user_courses(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     course_ids = user.get("courses", [])
-    object_ids = [ObjectId(course_id) for course_id in course_ids]
-    courses = await courses_collection.find({"_id": {"$in": object_ids}}).to_list(100)
-
-    for course in courses:
-        course["_id"] = str(course["_id"])
+    courses = await loader("courses").load_many(course_ids)
 
-    return courses
+    return BSONResponse(courses)
 
 # Add a course to a user
 @router.post("/{user_id}/courses/{course_id}")
 async def add_course_to_user(user_id: str, course_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    course = await courses_collection.find_one({"_id": ObjectId(course_id)})
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course_id in user.get("courses", []):
-        raise HTTPException(status_code=400, detail="Course already assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"courses": course_id}}
-    )
-
+    await user_courses.link(user_id, course_id)
     return {"message": "Course added to user successfully"}
 
 # Remove a course from a user
 @router.delete("/{user_id}/courses/{course_id}")
 async def remove_course_from_user(user_id: str, course_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    course = await courses_collection.find_one({"_id": ObjectId(course_id)})
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-
-    if course_id not in user.get("courses", []):
-        raise HTTPException(status_code=400, detail="Course not assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"courses": course_id}}
-    )
-
+    await user_courses.unlink(user_id, course_id)
     return {"message": "Course removed from user successfully"}
 
 # Get all notes for a specific user
 @router.get("/{user_id}/notes")
 async def get_user_notes(user_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
     note_ids = user.get("notes", [])
-    object_ids = [ObjectId(note_id) for note_id in note_ids]
-    notes = await notes_collection.find({"_id": {"$in": object_ids}}).to_list(100)
-
-    for note in notes:
-        note["_id"] = str(note["_id"])
+    notes = await loader("notes").load_many(note_ids)
 
-    return notes
+    return BSONResponse(notes)
 
 # Add a note to a user
 @router.post("/{user_id}/notes/{note_id}")
 async def add_note_to_user(user_id: str, note_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    note = await notes_collection.find_one({"_id": ObjectId(note_id)})
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-
-    if note_id in user.get("notes", []):
-        raise HTTPException(status_code=400, detail="Note already assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$push": {"notes": note_id}}
-    )
-
+    await user_notes.link(user_id, note_id)
     return {"message": "Note added to user successfully"}
 
 # Remove a note from a user
 @router.delete("/{user_id}/notes/{note_id}")
 async def remove_note_from_user(user_id: str, note_id: str):
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    note = await notes_collection.find_one({"_id": ObjectId(note_id)})
-    if not note:
-        raise HTTPException(status_code=404, detail="Note not found")
-
-    if note_id not in user.get("notes", []):
-        raise HTTPException(status_code=400, detail="Note not assigned to user")
-
-    await users_collection.update_one(
-        {"_id": ObjectId(user_id)},
-        {"$pull": {"notes": note_id}}
-    )
-
+    await user_notes.unlink(user_id, note_id)
     return {"message": "Note removed from user successfully"}
 
 # Authentication routes
@@ -586,6 +372,7 @@ async def update_user_location(
         {"_id": ObjectId(user_id)},
         {"$set": {"location": location.dict()}}
     )
+    users_cache.invalidate(user_id)
 
     if result.matched_count:
         return {"message": "Location updated successfully"}
@@ -596,7 +383,7 @@ async def update_user_location(
 async def get_friends_with_location(
         user_id: str):
 
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -612,7 +399,7 @@ async def get_friends_with_location(
     friends_with_location = await users_collection.find({
         "_id": {"$in": friend_object_ids},
         "location": {"$exists": True, "$ne": None}
-    }).to_list(100)
+    }).to_list(None)  # acotado por la lista de amigos del usuario
 
     # Format the response
     result = []
@@ -639,7 +426,7 @@ async def get_friends_with_location(
 @router.get("/{user_id}/schedule")
 async def get_or_create_user_schedule(user_id: str):
     # Check if the user exists
-    user = await users_collection.find_one({"_id": ObjectId(user_id)})
+    user = await users_cache.get(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -664,7 +451,7 @@ async def get_or_create_user_kanban(user_id: str):
         logging.info(f"Attempting to get/create kanban board for user: {user_id}")
         
         # Check if the user exists
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
+        user = await users_cache.get(user_id)
         if not user:
             logging.error(f"User not found: {user_id}")
             raise HTTPException(status_code=404, detail="User not found")
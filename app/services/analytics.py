@@ -0,0 +1,477 @@
+import json
+import os
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+
+from starlette.routing import compile_path
+
+from app.config import settings
+
+# Línea escrita por el middleware log_requests de main.py; las líneas antiguas no traen "Route:"
+# y "Route: -" marca un request que no coincidió con ninguna ruta
+LOG_PATTERN = re.compile(r"(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}).*?Method: (\w+).*?URL: (\S+).*?Response: (\d+)(?: - Route: (\S+))?(?: - Duration: ([\d.]+)ms)?")
+SCHEDULE_PATTERN = re.compile(r"/schedules/([\w\d]+)[/]?")
+SUBJECT_PATTERN = re.compile(r"/users/[\w\d]+/([\w\d]+)/flash")
+
+TRANSLATION = {
+    "POST": "modification",
+    "GET": "lecture",
+    "PUT": "modification",
+    "DELETE": "deletion"
+}
+
+# Se descartan checkpoints de otra versión y se re-ingiere desde el inicio
+CHECKPOINT_VERSION = 3
+
+# Bytes read per chunk while ingesting, so a large backlog never sits in memory at once
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+def get_key_url(url):
+    if 'flash' in url:
+        return 'users flashcards'
+    url = url.replace("http://", '').strip()
+    response = ''
+    split = url.split('/')
+    if '.' in "".join(split[1:]):
+        return ''
+
+    for i in range(1, len(split), 2):
+        response += split[i] + ' '
+    return response.strip()
+
+
+# Plantillas de ruta de la app, registradas desde main.py: [(regex, métodos, plantilla)]
+ROUTE_PATTERNS = []
+
+# Features cuyo nombre se conserva del esquema anterior de get_key_url
+ROUTE_FEATURE_OVERRIDES = {
+    "/users/{user_id}/{subject:path}/flash": "users flashcards",
+}
+
+
+def register_routes(routes):
+    ROUTE_PATTERNS[:] = [
+        (compile_path(route.path)[0], getattr(route, "methods", None) or set(), route.path)
+        for route in routes if hasattr(route, "path")
+    ]
+
+
+def resolve_route(method, url):
+    # Plantilla que FastAPI habría usado para el request, o '' si ninguna coincide
+    path = urlsplit(url).path or "/"
+    fallback = ''
+    for regex, methods, template in ROUTE_PATTERNS:
+        if regex.match(path):
+            if method in methods:
+                return template
+            fallback = fallback or template
+    return fallback
+
+
+def route_feature_key(template):
+    if template in ROUTE_FEATURE_OVERRIDES:
+        return ROUTE_FEATURE_OVERRIDES[template]
+    return " ".join(segment for segment in template.split("/") if segment and not segment.startswith("{"))
+
+
+def feature_for(method, url, route):
+    # route: plantilla registrada por el middleware, '' sin coincidencia, None en líneas antiguas
+    if route is None:
+        if not ROUTE_PATTERNS:
+            return get_key_url(url)
+        route = resolve_route(method, url)
+    return route_feature_key(route)
+
+
+def parse_line(line):
+    match = LOG_PATTERN.search(line)
+    if not match:
+        return None
+    timestamp, method, url, response, route, duration_ms = match.groups()
+    return {
+        "timestamp": datetime.fromisoformat(timestamp),
+        "method": method,
+        "url": url,
+        "response": int(response),
+        "route": '' if route == '-' else route,
+        "duration_ms": float(duration_ms) if duration_ms else None
+    }
+
+
+def parse_logs(log_file):
+    with open(log_file, "r", encoding='latin1') as file:
+        return [record for record in map(parse_line, file) if record]
+
+
+# Límites superiores (ms) de los buckets de latencia: cuatro por cada duplicación,
+# de 0.25 ms a ~65 s, más un bucket de desborde. Fijos para que los histogramas se sumen
+LATENCY_BOUNDS_MS = [0.25 * 2 ** (i / 4) for i in range(73)]
+
+
+class LatencyHistogram:
+    """Fixed log-scale latency histogram; merging two is adding their counts."""
+
+    def __init__(self, counts=None, maximum=0.0):
+        self.counts = counts or [0] * (len(LATENCY_BOUNDS_MS) + 1)
+        self.max = maximum
+
+    def add(self, duration_ms, count=1):
+        self.counts[bisect_left(LATENCY_BOUNDS_MS, duration_ms)] += count
+        self.max = max(self.max, duration_ms)
+
+    def merge(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def percentile(self, q):
+        # Límite superior del bucket que contiene el percentil, acotado por el máximo observado
+        rank = q * self.total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= rank:
+                return min(LATENCY_BOUNDS_MS[index], self.max) if index < len(LATENCY_BOUNDS_MS) else self.max
+        return 0.0
+
+    def summary(self):
+        return {
+            "count": self.total,
+            "p50": round(self.percentile(0.5), 3),
+            "p90": round(self.percentile(0.9), 3),
+            "p99": round(self.percentile(0.99), 3),
+            "max": round(self.max, 3),
+        }
+
+    def to_list(self):
+        return [self.max] + self.counts
+
+    @classmethod
+    def from_list(cls, data):
+        return cls(list(data[1:]), data[0])
+
+
+class RollupStore:
+    """Hourly and daily request counts per feature, method and status class.
+
+    Rows are keyed by bucket start ("2025-03-19T20" / "2025-03-19") and hold
+    a Counter of "feature\tmethod\tstatus_class" keys, so any time window
+    is answered by merging one row per bucket instead of rescanning lines.
+    Request latencies are kept the same way, as one LatencyHistogram per
+    route template and bucket. Every record is added to its hourly and its
+    daily row at once, so prune() can drop hourly rows past their retention
+    without losing totals; past that retention only day buckets have data.
+    """
+
+    def __init__(self):
+        self.hourly = {}
+        self.daily = {}
+        self.latency_hourly = {}
+        self.latency_daily = {}
+
+    def add(self, timestamp, feature, method, response, count=1):
+        key = f"{feature}\t{method}\t{response // 100}xx"
+        hour = timestamp.isoformat(timespec="hours")
+        self.hourly.setdefault(hour, Counter())[key] += count
+        self.daily.setdefault(hour[:10], Counter())[key] += count
+
+    def add_latency(self, timestamp, route, duration_ms, count=1):
+        hour = timestamp.isoformat(timespec="hours")
+        for rows, key in ((self.latency_hourly, hour), (self.latency_daily, hour[:10])):
+            histograms = rows.setdefault(key, {})
+            if route not in histograms:
+                histograms[route] = LatencyHistogram()
+            histograms[route].add(duration_ms, count)
+
+    def prune(self, hourly_days=None, daily_days=None):
+        # Las retenciones se cuentan desde la hora más reciente, no desde el reloj
+        newest = max(self.hourly, default=None)
+        if newest is None:
+            return
+        newest = datetime.fromisoformat(newest)
+        hour_cutoff = (newest - timedelta(days=hourly_days or settings.rollup_hourly_retention_days)).isoformat(timespec="hours")
+        day_cutoff = (newest - timedelta(days=daily_days or settings.rollup_daily_retention_days)).date().isoformat()
+        for rows, cutoff in ((self.hourly, hour_cutoff), (self.latency_hourly, hour_cutoff),
+                             (self.daily, day_cutoff), (self.latency_daily, day_cutoff)):
+            for key in [key for key in rows if key < cutoff]:
+                del rows[key]
+
+    @staticmethod
+    def _walk(start, end, use_days):
+        # Recorre [start, end) por horas, saltando días completos si use_days
+        current = start.replace(minute=0, second=0, microsecond=0)
+        while current < end:
+            if use_days and current.hour == 0 and current + timedelta(days=1) <= end:
+                yield current, current.date().isoformat(), True
+                current += timedelta(days=1)
+            else:
+                yield current, current.isoformat(timespec="hours"), False
+                current += timedelta(hours=1)
+
+    def query(self, start, end, bucket="hour"):
+        # Devuelve [(inicio del bucket, Counter)] para la ventana [start, end);
+        # en buckets diarios los días completos salen de una sola fila diaria
+        series = []
+        for current, key, is_day in self._walk(start, end, bucket == "day"):
+            row = self.daily.get(key) if is_day else self.hourly.get(key)
+            bucket_start = current.replace(hour=0) if bucket == "day" else current
+            if not series or series[-1][0] != bucket_start:
+                series.append((bucket_start, Counter()))
+            if row:
+                series[-1][1].update(row)
+        return series
+
+    def query_latency(self, start=None, end=None):
+        # {ruta: LatencyHistogram} combinado para la ventana, o para todo el historial
+        if start is None or end is None:
+            rows = self.latency_daily.values()
+        else:
+            rows = ((self.latency_daily if is_day else self.latency_hourly).get(key, {})
+                    for _, key, is_day in self._walk(start, end, True))
+        merged = {}
+        for histograms in rows:
+            for route, histogram in histograms.items():
+                merged.setdefault(route, LatencyHistogram()).merge(histogram)
+        return merged
+
+    def to_dict(self):
+        return {"hourly": {k: dict(v) for k, v in self.hourly.items()},
+                "daily": {k: dict(v) for k, v in self.daily.items()},
+                "latency_hourly": {k: {r: h.to_list() for r, h in v.items()} for k, v in self.latency_hourly.items()},
+                "latency_daily": {k: {r: h.to_list() for r, h in v.items()} for k, v in self.latency_daily.items()}}
+
+    @classmethod
+    def from_dict(cls, data):
+        rollups = cls()
+        rollups.hourly = {k: Counter(v) for k, v in data.get("hourly", {}).items()}
+        rollups.daily = {k: Counter(v) for k, v in data.get("daily", {}).items()}
+        rollups.latency_hourly = {k: {r: LatencyHistogram.from_list(h) for r, h in v.items()} for k, v in data.get("latency_hourly", {}).items()}
+        rollups.latency_daily = {k: {r: LatencyHistogram.from_list(h) for r, h in v.items()} for k, v in data.get("latency_daily", {}).items()}
+        return rollups
+
+
+class DashboardAggregator:
+    """Single-pass accumulator behind the eight dashboard charts.
+
+    Each parsed record is consumed once by add() and updates every chart's
+    counters together. Feature keys are memoized per route template, or per
+    method and URL for log lines written before routes were recorded, so
+    each record costs one dict lookup. generation counts the records
+    added, so a consumer can tell whether anything changed since it last
+    looked, whoever did the ingesting.
+    """
+
+    # Límite del memo; se vacía al llenarse porque las URLs de líneas antiguas llevan ids
+    MAX_MEMOIZED_URLS = 50000
+
+    def __init__(self):
+        self.fail_counts = Counter()
+        self.schedule_last_update = {}
+        self.update_patterns = {"daily": 0, "weekly": 0, "monthly": 0}
+        self.usage_counts = Counter()
+        self.flashcard_hours = [0] * 24
+        self.feature_counts = Counter()
+        self.subject_counts = Counter()
+        self.meeting_hours = [0] * 24
+        self.reminder_creates = 0
+        self.reminder_deletes = 0
+        self.rollups = RollupStore()
+        self.generation = 0
+        self._feature_keys = {}
+
+    def feature_key(self, method, url, route):
+        memo_key = route if route is not None else (method, url)
+        key = self._feature_keys.get(memo_key)
+        if key is None:
+            if len(self._feature_keys) >= self.MAX_MEMOIZED_URLS:
+                self._feature_keys.clear()
+            key = self._feature_keys[memo_key] = feature_for(method, url, route)
+        return key
+
+    def add(self, record):
+        url, method, response, timestamp = record["url"], record["method"], record["response"], record["timestamp"]
+        route = record.get("route")
+        key = self.feature_key(method, url, route)
+        self.generation += 1
+        self.rollups.add(timestamp, key, method, response)
+        if route and record.get("duration_ms") is not None:
+            self.rollups.add_latency(timestamp, route, record["duration_ms"])
+
+        if key != '':
+            self.feature_counts[key] += 1
+            if response >= 400:
+                self.fail_counts[key + " " + TRANSLATION.get(method, method.lower())] += 1
+            elif response == 200:
+                self.usage_counts[key + " " + TRANSLATION.get(method, method.lower())] += 1
+
+        if "schedules" in url and method == "PUT" and response == 200:
+            match = SCHEDULE_PATTERN.search(url)
+            if match:
+                schedule_id = match.group(1)
+                previous = self.schedule_last_update.get(schedule_id)
+                if previous is not None:
+                    delta_days = (timestamp - previous).days
+                    if delta_days < 2:
+                        self.update_patterns["daily"] += 1
+                    elif delta_days < 8:
+                        self.update_patterns["weekly"] += 1
+                    else:
+                        self.update_patterns["monthly"] += 1
+                self.schedule_last_update[schedule_id] = timestamp
+
+        if "flash" in url:
+            self.flashcard_hours[timestamp.hour] += 1
+            match = SUBJECT_PATTERN.search(url)
+            if match:
+                self.subject_counts[match.group(1)] += 1
+
+        if method == "POST" and response == 200 and "/meetings/" in url:
+            self.meeting_hours[timestamp.hour] += 1
+
+        if response == 200 and "reminders" in url:
+            if method == "POST":
+                self.reminder_creates += 1
+            elif method == "DELETE":
+                self.reminder_deletes += 1
+
+    def consume(self, records):
+        for record in records:
+            self.add(record)
+        return self
+
+    def to_dict(self):
+        return {
+            "fail_counts": dict(self.fail_counts),
+            "schedule_last_update": {k: v.isoformat() for k, v in self.schedule_last_update.items()},
+            "update_patterns": self.update_patterns,
+            "usage_counts": dict(self.usage_counts),
+            "flashcard_hours": self.flashcard_hours,
+            "feature_counts": dict(self.feature_counts),
+            "subject_counts": dict(self.subject_counts),
+            "meeting_hours": self.meeting_hours,
+            "reminder_creates": self.reminder_creates,
+            "reminder_deletes": self.reminder_deletes,
+            "rollups": self.rollups.to_dict(),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        aggregator = cls()
+        aggregator.fail_counts.update(data.get("fail_counts", {}))
+        aggregator.schedule_last_update = {k: datetime.fromisoformat(v) for k, v in data.get("schedule_last_update", {}).items()}
+        aggregator.update_patterns.update(data.get("update_patterns", {}))
+        aggregator.usage_counts.update(data.get("usage_counts", {}))
+        aggregator.flashcard_hours = data.get("flashcard_hours", aggregator.flashcard_hours)
+        aggregator.feature_counts.update(data.get("feature_counts", {}))
+        aggregator.subject_counts.update(data.get("subject_counts", {}))
+        aggregator.meeting_hours = data.get("meeting_hours", aggregator.meeting_hours)
+        aggregator.reminder_creates = data.get("reminder_creates", 0)
+        aggregator.reminder_deletes = data.get("reminder_deletes", 0)
+        aggregator.rollups = RollupStore.from_dict(data.get("rollups", {}))
+        return aggregator
+
+
+class LogIngester:
+    """Incremental reader for logs_app.log.
+
+    Remembers the inode and byte offset of the last parse in a checkpoint file
+    together with the running DashboardAggregator, so each call only parses the lines
+    appended since then. On a new inode (rotation) the unread tail of the
+    rotated <log>.1 is finished first; rotation or a file shorter than the
+    offset (truncation) then restarts reading from the top of the current
+    file while keeping the aggregates already folded.
+    """
+
+    def __init__(self, log_file, checkpoint_file=None):
+        # Rutas absolutas: no dependen del directorio de trabajo en cada ingest
+        self.log_file = os.path.abspath(log_file)
+        self.checkpoint_file = os.path.abspath(checkpoint_file or log_file + ".checkpoint.json")
+        self._lock = threading.Lock()
+        self.inode = None
+        self.offset = 0
+        self.aggregator = DashboardAggregator()
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return
+        if checkpoint.get("version") != CHECKPOINT_VERSION:
+            return
+        self.inode = checkpoint.get("inode")
+        self.offset = checkpoint.get("offset", 0)
+        self.aggregator = DashboardAggregator.from_dict(checkpoint.get("aggregates", {}))
+
+    def _save(self):
+        checkpoint = {"version": CHECKPOINT_VERSION, "inode": self.inode, "offset": self.offset, "aggregates": self.aggregator.to_dict()}
+        # Un temporal por proceso: los workers que guardan a la vez no se pisan
+        tmp_file = f"{self.checkpoint_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def _read(self, path):
+        ingested = 0
+        with open(path, "rb") as file:
+            file.seek(self.offset)
+            pending = b''
+            while True:
+                chunk = file.read(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunk = pending + chunk
+                # Una línea sin salto final todavía se está escribiendo
+                end = chunk.rfind(b'\n') + 1
+                pending = chunk[end:]
+                if not end:
+                    continue
+                for line in chunk[:end].decode('latin1').splitlines():
+                    record = parse_line(line)
+                    if record:
+                        self.aggregator.add(record)
+                        ingested += 1
+                self.offset += end
+        return ingested
+
+    def ingest(self):
+        # Devuelve el número de registros nuevos incorporados
+        with self._lock:
+            try:
+                stat = os.stat(self.log_file)
+            except FileNotFoundError:
+                return 0
+
+            checkpoint = (self.inode, self.offset)
+            ingested = 0
+            if stat.st_ino != self.inode:
+                # Rotado por tamaño: lo que quedaba sin leer está ahora en <log>.1
+                rotated = self.log_file + ".1"
+                try:
+                    if self.inode is not None and os.stat(rotated).st_ino == self.inode:
+                        ingested += self._read(rotated)
+                except FileNotFoundError:
+                    pass
+                self.inode = stat.st_ino
+                self.offset = 0
+            elif stat.st_size < self.offset:
+                self.offset = 0
+
+            if stat.st_size > self.offset:
+                ingested += self._read(self.log_file)
+
+            if (self.inode, self.offset) != checkpoint:
+                # El checkpoint se reescribe entero: el historial que guarda debe quedar acotado
+                self.aggregator.rollups.prune()
+                self._save()
+            return ingested
@@ -0,0 +1,147 @@
+import glob
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from app.services.analytics import LATENCY_BOUNDS_MS, RollupStore, LOG_PATTERN, SCHEDULE_PATTERN, SUBJECT_PATTERN, TRANSLATION, feature_for
+
+UPDATE_BINS = [-np.inf, 2, 8, np.inf]
+UPDATE_LABELS = ["daily", "weekly", "monthly"]
+
+
+def log_files(log_file):
+    # Los backups de la rotación (<log>.5 el más antiguo ... <log>.1) y después el log actual
+    backups = [path for path in glob.glob(glob.escape(log_file) + ".*") if path.rsplit(".", 1)[1].isdigit()]
+    return sorted(backups, key=lambda path: int(path.rsplit(".", 1)[1]), reverse=True) + [log_file]
+
+
+def load_frame(log_file):
+    # Un registro por fila: timestamp datetime64, method/feature categóricos
+    # Un solo findall sobre el texto completo; '.' no cruza saltos de línea
+    rows = []
+    for path in log_files(log_file):
+        try:
+            with open(path, "r", encoding='latin1') as file:
+                rows.extend(LOG_PATTERN.findall(file.read()))
+        except FileNotFoundError:
+            pass
+    parsed = pd.DataFrame(rows, columns=["timestamp", "method", "url", "response", "route", "duration_ms"], dtype=object)
+
+    # La feature se resuelve una vez por ruta distinta (o por método y URL en las
+    # líneas antiguas, a las que findall deja la ruta vacía) y se expande por los códigos
+    url = parsed["url"].astype("category")
+    routes = parsed["route"]
+    source_codes, _ = pd.factorize(routes.where(routes != '', parsed["method"] + " " + parsed["url"]))
+    _, first_rows = np.unique(source_codes, return_index=True)
+    firsts = parsed.iloc[first_rows]
+    feature_keys = np.array([
+        feature_for(method, row_url, None if route == '' else ('' if route == '-' else route))
+        for method, row_url, route in zip(firsts["method"], firsts["url"], firsts["route"])
+    ], dtype=object)
+    features, feature_of_source = np.unique(feature_keys, return_inverse=True)
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(parsed["timestamp"], format="%Y-%m-%d %H:%M:%S"),
+        "method": parsed["method"].astype("category"),
+        "url": url,
+        "response": parsed["response"].astype("int32"),
+        "feature": pd.Categorical.from_codes(feature_of_source[source_codes], categories=features),
+        # '' en líneas antiguas y en requests sin ruta; NaN sin duración registrada
+        "route": routes.replace('-', '').astype("category"),
+        "duration_ms": pd.to_numeric(parsed["duration_ms"].replace('', np.nan)),
+    })
+
+
+def _ordered_counts(codes, label):
+    # Conteos en orden de primera aparición, como un Counter alimentado en orden;
+    # las claves de texto se arman una vez por código distinto
+    uniques, first_seen, counts = np.unique(codes, return_index=True, return_counts=True)
+    order = np.argsort(first_seen)
+    return Counter({label(code): int(count) for code, count in zip(uniques[order].tolist(), counts[order].tolist())})
+
+
+def _url_mask(url, needle):
+    # El filtro se evalúa una vez por URL distinta y se expande por los códigos
+    matches = url.cat.categories.str.contains(needle, regex=False)
+    return pd.Series(np.asarray(matches, dtype=bool)[url.cat.codes.to_numpy()], index=url.index)
+
+
+def _hour_histogram(timestamps):
+    return np.bincount(timestamps.dt.hour.to_numpy(), minlength=24).tolist()
+
+
+class FrameAggregator:
+    """Columnar counterpart of DashboardAggregator.
+
+    Computes the same chart accumulators from a DataFrame built by
+    load_frame with vectorized masks, groupby/diff and bincount, exposing the
+    same attributes so construir_graficos renders identical figures.
+    """
+
+    def __init__(self, frame):
+        url = frame["url"]
+        method = frame["method"]
+        response = frame["response"].to_numpy()
+
+        features = frame["feature"].cat.categories
+        feature_codes = frame["feature"].cat.codes.to_numpy()
+        action_of_method = np.array([TRANSLATION.get(m, m.lower()) for m in method.cat.categories], dtype=object)
+        actions, action_codes = np.unique(action_of_method[method.cat.codes.to_numpy()], return_inverse=True)
+        # Par (feature, acción) codificado en un solo entero; los códigos categóricos son
+        # int8/int16 y el producto se desbordaría con más de 127 pares
+        pair_codes = feature_codes.astype(np.int64) * len(actions) + action_codes.astype(np.int64)
+        pair_label = lambda code: features[code // len(actions)] + " " + actions[code % len(actions)]
+
+        has_feature = feature_codes != features.get_indexer([''])[0]
+        self.feature_counts = _ordered_counts(feature_codes[has_feature], features.__getitem__)
+        self.fail_counts = _ordered_counts(pair_codes[has_feature & (response >= 400)], pair_label)
+        self.usage_counts = _ordered_counts(pair_codes[has_feature & (response == 200)], pair_label)
+
+        updates = frame[(method == "PUT") & (response == 200) & _url_mask(url, "schedules")]
+        schedule_id = updates["url"].astype(object).str.extract(SCHEDULE_PATTERN.pattern, expand=False)
+        intervals = updates["timestamp"].groupby(schedule_id, sort=False).diff().dropna().dt.days
+        patterns = pd.cut(intervals, UPDATE_BINS, right=False, labels=UPDATE_LABELS).value_counts()
+        self.update_patterns = {label: int(patterns.get(label, 0)) for label in UPDATE_LABELS}
+
+        is_flash = _url_mask(url, "flash")
+        self.flashcard_hours = _hour_histogram(frame["timestamp"][is_flash])
+        subjects = url[is_flash].astype(object).str.extract(SUBJECT_PATTERN.pattern, expand=False).dropna()
+        subject_codes, subject_names = pd.factorize(subjects)
+        self.subject_counts = _ordered_counts(subject_codes, subject_names.__getitem__)
+
+        is_meeting = (method == "POST") & (response == 200) & _url_mask(url, "/meetings/")
+        self.meeting_hours = _hour_histogram(frame["timestamp"][is_meeting])
+
+        is_reminder = (response == 200) & _url_mask(url, "reminders")
+        self.reminder_creates = int((is_reminder & (method == "POST")).sum())
+        self.reminder_deletes = int((is_reminder & (method == "DELETE")).sum())
+
+        # Se arma de cero en cada llamada: su generación es el número de registros
+        self.generation = len(frame)
+
+        self.rollups = RollupStore()
+        by_hour = pd.DataFrame({
+            "hour": frame["timestamp"].dt.floor("h"),
+            "feature": frame["feature"],
+            "method": method,
+            "status_class": response // 100,
+        }).groupby(["hour", "feature", "method", "status_class"], observed=True).size()
+        for (hour, feature, method_name, status_class), count in by_hour.items():
+            self.rollups.add(hour.to_pydatetime(), feature, method_name, status_class * 100, int(count))
+
+        timed = frame[frame["duration_ms"].notna() & (frame["route"] != '')]
+        latencies = pd.DataFrame({
+            "hour": timed["timestamp"].dt.floor("h"),
+            "route": timed["route"],
+            "bucket": np.searchsorted(LATENCY_BOUNDS_MS, timed["duration_ms"].to_numpy(), side="left"),
+            "duration_ms": timed["duration_ms"],
+        }).groupby(["hour", "route", "bucket"], observed=True)["duration_ms"].agg(["size", "max"])
+        # Todas las duraciones de un grupo caen en el mismo bucket; su máximo lo representa
+        for (hour, route, _), (count, maximum) in latencies.iterrows():
+            self.rollups.add_latency(hour.to_pydatetime(), route, maximum, int(count))
+        # La misma retención que aplican los ingestores incrementales
+        self.rollups.prune()
+
+    @classmethod
+    def from_log(cls, log_file):
+        return cls(load_frame(log_file))
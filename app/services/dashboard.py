@@ -0,0 +1,172 @@
+import asyncio
+import logging
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+
+from app.config import settings
+from charts import LOG_FILE, actualizar_agregados, construir_graficos, construir_graficos_ventana
+
+# Segundos que un dashboard renderizado se sirve sin revisar el log
+DASHBOARD_CACHE_TTL = settings.dashboard_cache_ttl
+
+
+def log_state(log_file):
+    try:
+        stat = os.stat(log_file)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+
+def resolve_window(start, end):
+    # Los timestamps del log son hora local sin zona; por defecto, las últimas 24 horas
+    if end is not None and end.tzinfo is not None:
+        end = end.astimezone().replace(tzinfo=None)
+    if start is not None and start.tzinfo is not None:
+        start = start.astimezone().replace(tzinfo=None)
+    end = end or datetime.now()
+    start = start or end - timedelta(days=1)
+    # Los rollups son por hora: la ventana se amplía a horas completas y la respuesta
+    # devuelve esos límites, que son los que cubren los conteos
+    start = start.replace(minute=0, second=0, microsecond=0)
+    if end.minute or end.second or end.microsecond:
+        end = end.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+    return start, end
+
+
+def by_status_class(row):
+    counts = Counter()
+    for key, count in row.items():
+        counts[key.rsplit("\t", 1)[1]] += count
+    return dict(counts)
+
+
+def window_summary(start, end, bucket, series):
+    totals = Counter()
+    for _, row in series:
+        totals.update(row)
+    rows = []
+    for key, count in totals.most_common():
+        feature, method, status_class = key.split("\t")
+        rows.append({"feature": feature, "method": method, "status_class": status_class, "count": count})
+    return {
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "bucket": bucket,
+        "series": [
+            {
+                "start": bucket_start.isoformat(),
+                "requests": sum(row.values()),
+                "by_status_class": by_status_class(row),
+            }
+            for bucket_start, row in series
+        ],
+        "rows": rows,
+    }
+
+
+class DashboardBuilder:
+    """Cached dashboard rendered off the event loop, one build at a time.
+
+    The rendered charts are kept in memory together with the log file state
+    (inode, size, mtime) they were built from. Within the TTL they are served
+    as is; once stale they are still served while a background refresh
+    ingests the new lines, and the Plotly figures are only re-rendered when
+    the aggregator is not the one (or not at the generation) they were built
+    from, which also catches lines ingested by the window queries. Refreshes
+    run on a single worker thread and concurrent callers share the in-flight
+    one. Window queries run on that thread too, at most max_window_requests
+    at a time; past that they are answered 503 instead of queueing work
+    ahead of the refresh.
+    """
+
+    def __init__(self, log_file, ttl, max_window_requests=None):
+        self.log_file = log_file
+        self.ttl = ttl
+        self.max_window_requests = max_window_requests or settings.dashboard_max_window_requests
+        self._window_requests = 0
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="dashboard")
+        self._in_flight = None
+        self._graficos = None
+        # Agregador y generación de los que salieron los gráficos en caché
+        self._source = None
+        self._generation = None
+        self._log_state = None
+        self._checked_at = 0.0
+
+    def _refresh(self):
+        state = log_state(self.log_file)
+        if self._graficos is None or state != self._log_state:
+            aggregator = actualizar_agregados()
+            if aggregator is not self._source or aggregator.generation != self._generation:
+                self._graficos = construir_graficos(aggregator)
+                self._source, self._generation = aggregator, aggregator.generation
+            self._log_state = state
+        self._checked_at = time.monotonic()
+        return self._graficos
+
+    def _clear(self, future):
+        if self._in_flight is future:
+            self._in_flight = None
+        if not future.cancelled() and future.exception():
+            logging.error(f"Dashboard refresh failed: {future.exception()}")
+
+    def _start_refresh(self):
+        if self._in_flight is None:
+            loop = asyncio.get_running_loop()
+            self._in_flight = loop.run_in_executor(self._executor, self._refresh)
+            self._in_flight.add_done_callback(self._clear)
+        return self._in_flight
+
+    @contextmanager
+    def _window_slot(self):
+        # Acota el trabajo encolado por las consultas por ventana delante del refresco
+        if self._window_requests >= self.max_window_requests:
+            raise HTTPException(status_code=503, detail="Dashboard busy, retry later", headers={"Retry-After": "1"})
+        self._window_requests += 1
+        try:
+            yield
+        finally:
+            self._window_requests -= 1
+
+    async def _submit(self, function, *args):
+        # Las consultas por ventana comparten el hilo del dashboard, que es el único que ingiere
+        return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    def _window(self, start, end, bucket):
+        return actualizar_agregados().rollups.query(start, end, bucket)
+
+    async def window(self, start, end, bucket):
+        with self._window_slot():
+            return await self._submit(self._window, start, end, bucket)
+
+    def _latency(self, start, end):
+        return actualizar_agregados().rollups.query_latency(start, end)
+
+    async def latency(self, start, end):
+        with self._window_slot():
+            return await self._submit(self._latency, start, end)
+
+    async def window_graficos(self, start, end, bucket):
+        with self._window_slot():
+            series = await self._submit(self._window, start, end, bucket)
+            latencies = await self._submit(self._latency, start, end)
+            return await self._submit(construir_graficos_ventana, series, bucket, latencies)
+
+    async def get(self):
+        if self._graficos is not None:
+            if time.monotonic() - self._checked_at >= self.ttl:
+                # stale-while-revalidate: se responde con la copia actual
+                self._start_refresh()
+            return self._graficos
+        # shield: si un visitante se desconecta, el build compartido sigue
+        return await asyncio.shield(self._start_refresh())
+
+
+dashboard_builder = DashboardBuilder(LOG_FILE, DASHBOARD_CACHE_TTL)
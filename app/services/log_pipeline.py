@@ -0,0 +1,185 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos, usar un solo worker
+    fcntl = None
+
+from app.config import settings
+
+LOG_QUEUE_SIZE = settings.log_queue_size
+LOG_BATCH_SIZE = settings.log_batch_size
+LOG_FLUSH_INTERVAL = settings.log_flush_interval
+LOG_MAX_BYTES = settings.log_max_bytes
+LOG_BACKUP_COUNT = settings.log_backup_count
+# Con la cola por encima de este nivel, los INFO se muestrean 1 de cada LOG_SAMPLE_EVERY
+LOG_SAMPLE_WATERMARK = 0.8
+LOG_SAMPLE_EVERY = 10
+# Mismo encoding con el que leen el log los agregadores del dashboard
+LOG_ENCODING = "latin1"
+# Segundos que stop() espera a que se vacíe la cola
+LOG_STOP_TIMEOUT = 5.0
+
+_STOP = object()
+
+
+class QueueingHandler(logging.Handler):
+    """Hands log records to a bounded queue without ever blocking the caller.
+
+    When the queue is nearly full INFO-and-below records are sampled, and
+    when it is full records are dropped; both are counted so the writer can
+    report the loss in the log itself.
+    """
+
+    def __init__(self, records):
+        super().__init__()
+        self.records = records
+        self.high_watermark = int(records.maxsize * LOG_SAMPLE_WATERMARK)
+        self.dropped = 0
+        self._seen = 0
+
+    def emit(self, record):
+        if record.levelno <= logging.INFO and self.records.qsize() >= self.high_watermark:
+            self._seen += 1
+            if self._seen % LOG_SAMPLE_EVERY:
+                self.dropped += 1
+                return
+        try:
+            self.records.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchedLogWriter(threading.Thread):
+    """Background thread that drains the queue into a size-rotated file.
+
+    Records are formatted here, off the request path, and written in
+    batches: a batch is flushed once it reaches batch_size or flush_interval
+    seconds after the previous flush. When the file would grow past
+    max_bytes it is rotated to .1, .2, ... keeping backup_count files.
+
+    Every uvicorn worker runs its own writer on the same file, so each
+    batch is written holding an flock on path + ".lock": the size check and
+    the rotation see what the other workers wrote, and a writer whose file
+    was rotated by another worker reopens the new one before appending.
+    """
+
+    def __init__(self, path, records, handler, batch_size=LOG_BATCH_SIZE, flush_interval=LOG_FLUSH_INTERVAL,
+                 max_bytes=LOG_MAX_BYTES, backup_count=LOG_BACKUP_COUNT):
+        super().__init__(name="log-writer", daemon=True)
+        self.path = path
+        self.records = records
+        self.handler = handler
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._reported_dropped = 0
+        self._stop_requested = threading.Event()
+        self._lock_file = open(path + ".lock", "a") if fcntl else None
+        self._file = open(path, "ab")
+
+    def _reopen_if_rotated(self):
+        try:
+            rotated = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            self._file.close()
+            self._file = open(self.path, "ab")
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+
+    def _write(self, batch):
+        lines = []
+        for record in batch:
+            try:
+                lines.append(self.handler.format(record) + "\n")
+            except Exception:
+                self.handler.handleError(record)
+        dropped = self.handler.dropped
+        if dropped > self._reported_dropped:
+            lines.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')},000 - WARNING - Log queue full: dropped {dropped - self._reported_dropped} records\n")
+            self._reported_dropped = dropped
+        data = "".join(lines).encode(LOG_ENCODING, errors="backslashreplace")
+        if self._lock_file:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+        try:
+            self._reopen_if_rotated()
+            size = os.fstat(self._file.fileno()).st_size
+            if self.max_bytes and size and size + len(data) > self.max_bytes:
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+        finally:
+            if self._lock_file:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def run(self):
+        batch = []
+        flushed_at = time.monotonic()
+        stopping = False
+        while not stopping:
+            try:
+                record = self.records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+            while record is not None:
+                if record is _STOP:
+                    stopping = True
+                    break
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    record = self.records.get_nowait()
+                except queue.Empty:
+                    record = None
+            # Si stop() no pudo encolar _STOP (cola llena), se para al vaciarla
+            stopping = stopping or (self._stop_requested.is_set() and self.records.empty())
+            now = time.monotonic()
+            if batch and (stopping or len(batch) >= self.batch_size or now - flushed_at >= self.flush_interval):
+                self._write(batch)
+                batch = []
+                flushed_at = now
+        self._file.close()
+        if self._lock_file:
+            self._lock_file.close()
+
+    def stop(self, timeout=LOG_STOP_TIMEOUT):
+        # Espera, como mucho timeout segundos, a que se escriba lo que ya estaba en cola
+        self._stop_requested.set()
+        try:
+            self.records.put_nowait(_STOP)
+        except queue.Full:
+            pass
+        self.join(timeout)
+
+
+def configure_logging(path, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"):
+    records = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    handler = QueueingHandler(records)
+    handler.setFormatter(logging.Formatter(format))
+    writer = BatchedLogWriter(path, records, handler)
+    writer.start()
+    atexit.register(writer.stop)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    return writer
@@ -0,0 +1,281 @@
+import asyncio
+import glob
+import json
+import os
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+from pymongo import monitoring
+
+from app.config import settings
+from app.services.analytics import LATENCY_BOUNDS_MS, LatencyHistogram
+
+# Con varios workers de uvicorn, cada proceso deja su snapshot en este directorio
+# y /metrics suma los de todos; al arrancar se borran los de procesos que ya no existen
+METRICS_MULTIPROC_DIR = settings.metrics_multiproc_dir
+# Cada worker reescribe su snapshot con esta frecuencia, también sin tráfico
+SNAPSHOT_INTERVAL = 1.0
+# Se exporta un bucket por cada duplicación (0.25ms, 0.5ms, ... ~65s) de los del histograma
+EXPORTED_BUCKETS = list(range(0, len(LATENCY_BOUNDS_MS), 4))
+
+HELP = {
+    "http_requests_total": ("counter", "HTTP requests by method, route template and status."),
+    "http_requests_in_flight": ("gauge", "HTTP requests currently being served."),
+    "http_request_duration_seconds": ("histogram", "HTTP request duration by route template."),
+    "mongo_pool_checkouts_total": ("counter", "Connections checked out of the MongoDB pool."),
+    "mongo_pool_checkout_failures_total": ("counter", "Failed MongoDB pool checkouts by reason."),
+    "mongo_pool_checked_out": ("gauge", "MongoDB connections currently checked out."),
+    "mongo_pool_connections": ("gauge", "MongoDB connections currently open."),
+    "mongo_pool_checkout_duration_seconds": ("histogram", "Time spent waiting for a MongoDB connection."),
+    "llm_calls_total": ("counter", "Calls to the flashcard LLM by outcome."),
+    "llm_call_duration_seconds": ("histogram", "Duration of calls to the flashcard LLM."),
+    "document_cache_requests_total": ("counter", "By-id document cache lookups by cache and result."),
+    "mongo_reads_coalesced_total": ("counter", "Reads served by joining an identical in-flight query."),
+}
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values):
+    return ",".join(f'{name}="{escape(value)}"' for name, value in values.items())
+
+
+def snapshot_pid(path):
+    try:
+        return int(os.path.basename(path).split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class WorkerMetrics:
+    """Counters, gauges and latency histograms of one worker process.
+
+    Series are keyed by "name\\tlabels". They are only mutated from the event
+    loop, so no locks are needed; events raised on other threads (the MongoDB
+    pool listener, the LLM client) are appended to a deque and folded in
+    before every snapshot.
+    """
+
+    def __init__(self):
+        self.counters = Counter()
+        self.gauges = Counter()
+        self.histograms = {}
+        self.sums = Counter()
+        self.events = deque()
+        self._snapshot_handle = None
+
+    def inc(self, name, label="", value=1):
+        self.counters[f"{name}\t{label}"] += value
+
+    def gauge_add(self, name, label="", value=1):
+        self.gauges[f"{name}\t{label}"] += value
+
+    def observe(self, name, label, duration_ms):
+        key = f"{name}\t{label}"
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = LatencyHistogram()
+        histogram.add(duration_ms)
+        self.sums[key] += duration_ms
+
+    def record_threadsafe(self, method, *args):
+        # deque.append es atómico; el evento se aplica en el próximo snapshot
+        self.events.append((method, args))
+
+    def _drain(self):
+        while self.events:
+            method, args = self.events.popleft()
+            getattr(self, method)(*args)
+
+    def request_started(self):
+        self.gauge_add("http_requests_in_flight")
+        # Un request lento (p. ej. una llamada al LLM) tiene que verse desde otros workers
+        if METRICS_MULTIPROC_DIR:
+            self._schedule_snapshot()
+
+    def request_finished(self, method, route, status, duration_ms):
+        self.gauge_add("http_requests_in_flight", value=-1)
+        self.inc("http_requests_total", labels(method=method, route=route, status=status))
+        self.observe("http_request_duration_seconds", labels(route=route), duration_ms)
+        if METRICS_MULTIPROC_DIR:
+            self._schedule_snapshot()
+
+    def snapshot(self):
+        self._drain()
+        return {
+            "counters": dict(self.counters),
+            "gauges": dict(self.gauges),
+            "histograms": {key: histogram.to_list() for key, histogram in self.histograms.items()},
+            "sums": dict(self.sums),
+        }
+
+    def _write_snapshot(self):
+        if self._snapshot_handle is not None:
+            self._snapshot_handle.cancel()
+            self._snapshot_handle = None
+        path = os.path.join(METRICS_MULTIPROC_DIR, f"{os.getpid()}.json")
+        with open(path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(path + ".tmp", path)
+
+    def _schedule_snapshot(self):
+        # Como mucho un snapshot por intervalo, y siempre uno tras la última actividad
+        if self._snapshot_handle is None:
+            self._snapshot_handle = asyncio.get_running_loop().call_later(SNAPSHOT_INTERVAL, self._write_snapshot)
+
+    async def publish_snapshots(self):
+        # Tarea del lifespan: publica gauges y eventos del pool aunque el worker esté ocioso
+        if not METRICS_MULTIPROC_DIR:
+            return
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+        while True:
+            self._write_snapshot()
+            await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+    def collect(self):
+        if not METRICS_MULTIPROC_DIR:
+            return [self.snapshot()]
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+        self._write_snapshot()
+        snapshots = []
+        for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json")):
+            pid = snapshot_pid(path)
+            try:
+                dead = pid != os.getpid() and (pid is None or not pid_alive(pid))
+                with open(path, "r", encoding="utf-8") as file:
+                    snapshot = json.load(file)
+            except (FileNotFoundError, ValueError):
+                continue
+            # Los contadores de un worker muerto siguen sumando; sus gauges ya no valen
+            if dead:
+                snapshot["gauges"] = {}
+            snapshots.append(snapshot)
+        return snapshots
+
+    def remove_dead_snapshots(self):
+        # Al arrancar: snapshots de procesos que ya no existen y temporales a medio escribir
+        if not METRICS_MULTIPROC_DIR:
+            return
+        for path in glob.glob(os.path.join(METRICS_MULTIPROC_DIR, "*.json*")):
+            pid = snapshot_pid(path)
+            if path.endswith(".tmp") or pid is None or not pid_alive(pid):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def merge_snapshots(snapshots):
+    counters, gauges, sums, histograms = Counter(), Counter(), Counter(), {}
+    for snapshot in snapshots:
+        counters.update(snapshot["counters"])
+        gauges.update(snapshot["gauges"])
+        sums.update(snapshot["sums"])
+        for key, data in snapshot["histograms"].items():
+            histogram = LatencyHistogram.from_list(data)
+            if key in histograms:
+                histograms[key].merge(histogram)
+            else:
+                histograms[key] = histogram
+    return counters, gauges, sums, histograms
+
+
+def render(snapshots):
+    counters, gauges, sums, histograms = merge_snapshots(snapshots)
+    series = {}
+    for values in (counters, gauges):
+        for key, value in values.items():
+            name, label = key.split("\t", 1)
+            series.setdefault(name, []).append(f"{name}{{{label}}} {value}" if label else f"{name} {value}")
+    for key, histogram in sorted(histograms.items()):
+        name, label = key.split("\t", 1)
+        prefix = label + "," if label else ""
+        lines = series.setdefault(name, [])
+        cumulative = 0
+        counts = histogram.counts
+        previous = 0
+        for index in EXPORTED_BUCKETS:
+            cumulative += sum(counts[previous:index + 1])
+            previous = index + 1
+            lines.append(f'{name}_bucket{{{prefix}le="{LATENCY_BOUNDS_MS[index] / 1000:g}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.total}')
+        suffix = f"{{{label}}}" if label else ""
+        lines.append(f"{name}_sum{suffix} {sums[key] / 1000:.6f}")
+        lines.append(f"{name}_count{suffix} {histogram.total}")
+
+    output = []
+    for name in sorted(series):
+        kind, text = HELP.get(name, ("untyped", name))
+        output.append(f"# HELP {name} {text}")
+        output.append(f"# TYPE {name} {kind}")
+        output.extend(sorted(series[name]) if kind != "histogram" else series[name])
+    return "\n".join(output) + "\n"
+
+
+metrics = WorkerMetrics()
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Feeds MongoDB connection pool checkout stats into the worker metrics."""
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        metrics.record_threadsafe("gauge_add", "mongo_pool_connections", "", 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        metrics.record_threadsafe("gauge_add", "mongo_pool_connections", "", -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        metrics.record_threadsafe("inc", "mongo_pool_checkout_failures_total", labels(reason=event.reason))
+
+    def connection_checked_out(self, event):
+        metrics.record_threadsafe("inc", "mongo_pool_checkouts_total", "", 1)
+        metrics.record_threadsafe("gauge_add", "mongo_pool_checked_out", "", 1)
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            metrics.record_threadsafe("observe", "mongo_pool_checkout_duration_seconds", "", duration * 1000)
+
+    def connection_checked_in(self, event):
+        metrics.record_threadsafe("gauge_add", "mongo_pool_checked_out", "", -1)
+
+
+@contextmanager
+def track_llm_call():
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        metrics.record_threadsafe("inc", "llm_calls_total", labels(outcome=outcome), 1)
+        metrics.record_threadsafe("observe", "llm_call_duration_seconds", "", (time.perf_counter() - start) * 1000)
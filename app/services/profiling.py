@@ -0,0 +1,104 @@
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+
+from app.config import settings
+
+
+def sample_rate(admin_token, rate):
+    # Sin token nadie podría leer los perfiles en /admin/profiles: no se muestrea
+    if rate > 0 and not admin_token:
+        logging.warning("PROFILE_SAMPLE_RATE is ignored because ADMIN_TOKEN is not set")
+        return 0
+    return rate
+
+
+# Token para las rutas /admin y para pedir un perfil con la cabecera X-Profile
+ADMIN_TOKEN = settings.admin_token
+# Fracción de requests que se perfilan sin pedirlo (0 = ninguna); requiere ADMIN_TOKEN
+PROFILE_SAMPLE_RATE = sample_rate(ADMIN_TOKEN, settings.profile_sample_rate)
+PROFILE_INTERVAL = settings.profile_interval
+MAX_PROFILES = settings.max_profiles
+
+# Con esto en False el middleware ni siquiera mira las cabeceras
+PROFILING_ENABLED = bool(ADMIN_TOKEN)
+
+profiles = deque(maxlen=MAX_PROFILES)
+
+
+def is_admin_token(token):
+    return bool(ADMIN_TOKEN) and token is not None and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def wants_profile(headers):
+    token = headers.get(b"x-profile")
+    if token is not None and is_admin_token(token.decode("latin-1")):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler(threading.Thread):
+    """Samples the stack of one thread at a fixed interval.
+
+    Stacks are kept in collapsed form ("outer;inner;leaf" -> samples), the
+    input of flamegraph.pl and speedscope. Sampling the event loop thread
+    also catches other requests interleaved with the profiled one.
+    """
+
+    def __init__(self, thread_id, interval=PROFILE_INTERVAL):
+        super().__init__(name="profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.stacks
+
+
+def start_profile():
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    return sampler, datetime.now()
+
+
+def finish_profile(sampler, started_at, method, path, route, status, duration_ms):
+    stacks = sampler.stop()
+    profiles.append({
+        "id": uuid.uuid4().hex,
+        "started_at": started_at.isoformat(),
+        "method": method,
+        "path": path,
+        "route": route,
+        "status": status,
+        "duration_ms": round(duration_ms, 2),
+        "samples": sum(stacks.values()),
+        "stacks": stacks,
+    })
+
+
+def collapsed(profile):
+    return "".join(f"{stack} {count}\n" for stack, count in profile["stacks"].most_common())
@@ -0,0 +1,74 @@
+import contextvars
+
+from pymongo import monitoring
+
+from app.config import settings
+
+# Comandos de Mongo por request a partir de los cuales se registra un warning
+MONGO_QUERY_BUDGET = settings.mongo_query_budget
+
+current_query_stats = contextvars.ContextVar("current_query_stats", default=None)
+
+
+class QueryStats:
+    """MongoDB commands issued while serving one request.
+
+    Motor runs pymongo on executor threads with a copy of the request's
+    context, so the listener finds this object through a contextvar. Events
+    are appended to a list (atomic under the GIL) and only summed when the
+    request finishes, so concurrent queries of one request need no lock.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    @property
+    def commands(self):
+        return len(self.events)
+
+    @property
+    def documents(self):
+        return sum(documents for _, _, documents in self.events)
+
+    @property
+    def duration_ms(self):
+        return sum(duration_ms for _, duration_ms, _ in self.events)
+
+    def server_timing(self):
+        return f'mongo;dur={self.duration_ms:.2f};desc="{self.commands} commands, {self.documents} docs"'
+
+    def over_budget(self, budget=MONGO_QUERY_BUDGET):
+        return self.commands > budget
+
+    def describe(self):
+        names = {}
+        for name, _, _ in self.events:
+            names[name] = names.get(name, 0) + 1
+        return ", ".join(f"{name} x{count}" for name, count in names.items())
+
+
+def returned_documents(reply):
+    cursor = reply.get("cursor")
+    if isinstance(cursor, dict):
+        return len(cursor.get("firstBatch", cursor.get("nextBatch", [])))
+    # findAndModify devuelve el documento en "value"
+    if reply.get("value") is not None:
+        return 1
+    return 0
+
+
+class QueryStatsListener(monitoring.CommandListener):
+    """Adds every finished MongoDB command to the current request's QueryStats."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.events.append((event.command_name, event.duration_micros / 1000, returned_documents(event.reply)))
+
+    def failed(self, event):
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.events.append((event.command_name, event.duration_micros / 1000, 0))
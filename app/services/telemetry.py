@@ -0,0 +1,205 @@
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from datetime import datetime
+
+from app.services.analytics import CHECKPOINT_VERSION, DashboardAggregator
+
+# Segmentos append-only de registros binarios con prefijo de longitud:
+#   <I longitud> <d timestamp> <B método> <H status> <f duración ms> <H len ruta> <H len path> ruta path
+SEGMENT_MAGIC = b"UVTS\x01"
+SEGMENT_SUFFIX = ".seg"
+LENGTH = struct.Struct("<I")
+RECORD = struct.Struct("<dBHfHH")
+
+METHODS = ("OTHER", "GET", "POST", "PUT", "DELETE", "PATCH", "HEAD", "OPTIONS")
+METHOD_CODES = {method: code for code, method in enumerate(METHODS)}
+
+MAX_SEGMENT_BYTES = 16 * 1024 * 1024
+# Cada cuánto se vacía el buffer para que los lectores vean los registros nuevos
+FLUSH_INTERVAL = 1.0
+# Registros pendientes de escribir; con la cola llena se descartan y se cuentan
+SEGMENT_QUEUE_SIZE = 10000
+# Segundos que close() espera a que se escriba lo pendiente
+CLOSE_TIMEOUT = 5.0
+
+_STOP = object()
+
+
+class SegmentWriter:
+    """Appends request records to rolling segment files in a directory.
+
+    append() only packs the record and hands it to a bounded queue; a
+    background thread writes them, so no file I/O happens on the event
+    loop. The buffer is flushed every flush_interval seconds, also when
+    traffic stops, so readers see the tail within that delay. close()
+    writes what is still queued.
+
+    Segments are named by their creation time in milliseconds and the pid
+    of the worker that writes them, so workers never share a file and
+    sorting the names gives creation order. A segment is closed and a new
+    one started once it reaches max_segment_bytes.
+    """
+
+    def __init__(self, directory, max_segment_bytes=MAX_SEGMENT_BYTES, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._records = queue.Queue(maxsize=SEGMENT_QUEUE_SIZE)
+        self._file = None
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="segment-writer", daemon=True)
+        self._thread.start()
+
+    def _roll(self):
+        if self._file:
+            self._file.close()
+        path = os.path.join(self.directory, f"{time.time_ns() // 1_000_000:016d}-{os.getpid()}{SEGMENT_SUFFIX}")
+        self._file = open(path, "ab")
+        self._file.write(SEGMENT_MAGIC)
+        self._size = len(SEGMENT_MAGIC)
+
+    def append(self, timestamp, method, route, path, status, duration_ms):
+        route_bytes = route.encode("utf-8")[:0xFFFF]
+        path_bytes = path.encode("utf-8")[:0xFFFF]
+        body = RECORD.pack(timestamp, METHOD_CODES.get(method, 0), status, duration_ms, len(route_bytes), len(path_bytes))
+        try:
+            self._records.put_nowait(LENGTH.pack(len(body) + len(route_bytes) + len(path_bytes)) + body + route_bytes + path_bytes)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write(self, record):
+        if self._file is None or self._size + len(record) > self.max_segment_bytes:
+            self._roll()
+        self._file.write(record)
+        self._size += len(record)
+
+    def _run(self):
+        flushed_at = time.monotonic()
+        pending = False
+        while True:
+            try:
+                record = self._records.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                break
+            if record is not None:
+                self._write(record)
+                pending = True
+            now = time.monotonic()
+            if pending and (record is None or now - flushed_at >= self.flush_interval):
+                self._file.flush()
+                flushed_at, pending = now, False
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def close(self, timeout=CLOSE_TIMEOUT):
+        # El hilo escribe lo que ya estaba en cola antes de _STOP
+        try:
+            self._records.put(_STOP, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+
+def list_segments(directory):
+    try:
+        return sorted(name for name in os.listdir(directory) if name.endswith(SEGMENT_SUFFIX))
+    except FileNotFoundError:
+        return []
+
+
+def read_segment(path, offset=0):
+    """Yields (end_offset, record) for every complete record after offset.
+
+    The file is memory-mapped and records are decoded with struct.unpack_from
+    straight from the mapping; a trailing record still being written is left
+    for the next read.
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= len(SEGMENT_MAGIC):
+            return
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as mapped:
+            if mapped[:len(SEGMENT_MAGIC)] != SEGMENT_MAGIC:
+                raise ValueError(f"Not a request segment: {path}")
+            offset = max(offset, len(SEGMENT_MAGIC))
+            while offset + LENGTH.size <= size:
+                (length,) = LENGTH.unpack_from(mapped, offset)
+                start = offset + LENGTH.size
+                end = start + length
+                if end > size:
+                    break
+                timestamp, method, status, duration_ms, route_len, path_len = RECORD.unpack_from(mapped, start)
+                strings = start + RECORD.size
+                yield end, {
+                    "timestamp": timestamp,
+                    "method": METHODS[method] if method < len(METHODS) else "OTHER",
+                    "route": mapped[strings:strings + route_len].decode("utf-8"),
+                    "url": mapped[strings + route_len:strings + route_len + path_len].decode("utf-8"),
+                    "response": status,
+                    "duration_ms": duration_ms,
+                }
+                offset = end
+
+
+class SegmentIngester:
+    """Incremental DashboardAggregator fed from request segments.
+
+    Segments are append-only, but each worker appends to its own, so the
+    checkpoint keeps the offset reached in every segment still on disk;
+    a segment already read to its end costs one stat per ingest.
+    """
+
+    def __init__(self, directory, checkpoint_file=None):
+        self.directory = os.path.abspath(directory)
+        self.checkpoint_file = os.path.abspath(checkpoint_file or os.path.join(directory, "checkpoint.json"))
+        self.offsets = {}
+        self.aggregator = DashboardAggregator()
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as file:
+                checkpoint = json.load(file)
+            if checkpoint.get("version") != CHECKPOINT_VERSION or "offsets" not in checkpoint:
+                raise ValueError("stale checkpoint")
+            self.offsets = checkpoint["offsets"]
+            self.aggregator = DashboardAggregator.from_dict(checkpoint.get("aggregates", {}))
+        except (FileNotFoundError, ValueError):
+            pass
+
+    def _save(self):
+        checkpoint = {"version": CHECKPOINT_VERSION, "offsets": self.offsets, "aggregates": self.aggregator.to_dict()}
+        # Un temporal por proceso: los workers que guardan a la vez no se pisan
+        tmp_file = f"{self.checkpoint_file}.{os.getpid()}.tmp"
+        with open(tmp_file, "w", encoding="utf-8") as file:
+            json.dump(checkpoint, file)
+        os.replace(tmp_file, self.checkpoint_file)
+
+    def ingest(self):
+        ingested = 0
+        names = list_segments(self.directory)
+        for name in names:
+            path = os.path.join(self.directory, name)
+            offset = self.offsets.get(name, 0)
+            if offset and os.path.getsize(path) <= offset:
+                continue
+            for offset, record in read_segment(path, offset):
+                record["timestamp"] = datetime.fromtimestamp(record["timestamp"])
+                self.aggregator.add(record)
+                ingested += 1
+            self.offsets[name] = offset
+        # Los segmentos borrados ya no necesitan offset
+        removed = self.offsets.keys() - set(names)
+        for name in removed:
+            del self.offsets[name]
+        if ingested or removed:
+            self.aggregator.rollups.prune()
+            self._save()
+        return ingested
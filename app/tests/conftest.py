@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import coalescing, database
+from app.config import settings
+
+
+def log_line(timestamp, method, url, status, route=None, duration_ms=None):
+    # Mismo formato que escribe RequestLogMiddleware; sin route imita las líneas antiguas
+    line = f"{timestamp:%Y-%m-%d %H:%M:%S},000 - INFO - IP: 127.0.0.1 - Method: {method} - URL: http://testserver{url} - Body: False Response: {status}"
+    if route is not None:
+        line += f" - Route: {route or '-'} - Duration: {duration_ms or 1.0:.2f}ms"
+    return line + "\n"
+
+
+@pytest.fixture
+def write_log(tmp_path):
+    path = tmp_path / "logs_app.log"
+
+    def write(lines, mode="a"):
+        with open(path, mode, encoding="latin1") as file:
+            file.writelines(lines)
+        return str(path)
+
+    return write
+
+
+@pytest.fixture
+def start_time():
+    return datetime(2025, 3, 19, 8, 0, 0)
+
+
+def hours(n):
+    return timedelta(hours=n)
+
+
+class SlowCollection:
+    # find_one que no responde hasta que el test lo suelta
+    name = "slow"
+
+    def __init__(self, document):
+        self.document = document
+        self.calls = 0
+        self.release = None
+
+    async def find_one(self, filter, projection=None):
+        self.calls += 1
+        await self.release.wait()
+        return dict(self.document) if self.document else None
+
+
+class AsyncCursor:
+    # Lo que usa el código de los cursores de Motor, sobre un cursor de mongomock
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, count):
+        self._cursor = self._cursor.limit(count)
+        return self
+
+    def skip(self, count):
+        self._cursor = self._cursor.skip(count)
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    async def to_list(self, length=None):
+        documents = list(self._cursor)
+        return documents if length is None else documents[:length]
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._cursor)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self._cursor.close()
+
+
+class AsyncCollection:
+    """Motor-like async facade over a mongomock collection."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+        self.calls = []
+
+    def find(self, *args, **kwargs):
+        self.calls.append("find")
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline, **kwargs):
+        self.calls.append("aggregate")
+        return AsyncCursor(iter(self._collection.aggregate(pipeline, **kwargs)))
+
+    def __getattr__(self, attr):
+        method = getattr(self._collection, attr)
+
+        async def call(*args, **kwargs):
+            self.calls.append(attr)
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncClient:
+    def __init__(self, client):
+        self._client = client
+        self._collections = {}
+
+    def __getitem__(self, db_name):
+        return _AsyncDatabase(self, db_name)
+
+    def close(self):
+        pass
+
+
+class _AsyncDatabase:
+    def __init__(self, client, db_name):
+        self._client = client
+        self._db_name = db_name
+
+    def __getitem__(self, name):
+        key = (self._db_name, name)
+        if key not in self._client._collections:
+            self._client._collections[key] = AsyncCollection(self._client._client[self._db_name][name])
+        return self._client._collections[key]
+
+
+@pytest.fixture
+def mongo(monkeypatch):
+    """Connects app.database to an in-memory mongomock client; returns its sync database for seeding."""
+    mongomock = pytest.importorskip("mongomock")
+    client = AsyncClient(mongomock.MongoClient())
+    monkeypatch.setattr(database, "client", client)
+    coalescing._in_flight.clear()
+    yield client._client[settings.db_name]
+    coalescing._in_flight.clear()
@@ -0,0 +1,181 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from app.services.analytics import DashboardAggregator, LatencyHistogram, LogIngester, RollupStore
+from app.tests.conftest import hours, log_line
+
+
+def test_prune_drops_rows_past_retention(start_time):
+    rollups = RollupStore()
+    for offset in (0, 24 * 5, 24 * 40):
+        timestamp = start_time + hours(offset)
+        rollups.add(timestamp, "Tasks", "GET", 200)
+        rollups.add_latency(timestamp, "/tasks", 12.0)
+
+    rollups.prune(hourly_days=30, daily_days=38)
+
+    assert sorted(rollups.hourly) == ["2025-04-28T08"]
+    assert sorted(rollups.latency_hourly) == sorted(rollups.hourly)
+    assert sorted(rollups.daily) == ["2025-03-24", "2025-04-28"]
+    assert sorted(rollups.latency_daily) == sorted(rollups.daily)
+
+
+def test_pruned_hours_still_count_in_day_buckets(start_time):
+    rollups = RollupStore()
+    rollups.add(start_time, "Tasks", "GET", 200)
+    rollups.add(start_time + hours(24 * 40), "Tasks", "GET", 200)
+    rollups.prune(hourly_days=30, daily_days=400)
+
+    day = datetime(2025, 3, 19)
+    [(bucket, counts)] = rollups.query(day, day + hours(24), "day")
+    assert counts == {"Tasks\tGET\t2xx": 1}
+    assert sum(sum(c.values()) for _, c in rollups.query(day, day + hours(24), "hour")) == 0
+
+
+def test_ingester_checkpoint_stays_bounded(write_log, tmp_path, start_time, monkeypatch):
+    monkeypatch.setattr("app.config.settings.rollup_hourly_retention_days", 2)
+    lines = [log_line(start_time + hours(n), "GET", "/tasks/1", 200, "/tasks/{task_id}") for n in range(24 * 10)]
+    ingester = LogIngester(write_log(lines), str(tmp_path / "checkpoint.json"))
+    ingester.ingest()
+
+    with open(tmp_path / "checkpoint.json", encoding="utf-8") as file:
+        rollups = json.load(file)["aggregates"]["rollups"]
+    assert len(rollups["hourly"]) == 2 * 24 + 1
+    assert len(rollups["latency_hourly"]) == 2 * 24 + 1
+    assert len(rollups["daily"]) == 11
+
+
+def tasks_lines(start, count, offset=0):
+    return [log_line(start + hours(offset + i), "GET", f"/tasks/{i}", 200, "/tasks/{task_id}") for i in range(count)]
+
+
+def test_ingest_reads_only_appended_lines_and_resumes_from_checkpoint(write_log, tmp_path, start_time):
+    log_file = write_log(tasks_lines(start_time, 3))
+    ingester = LogIngester(log_file)
+    assert ingester.ingest() == 3
+    assert ingester.ingest() == 0
+
+    # Una línea a medio escribir se deja para el siguiente ingest
+    write_log(tasks_lines(start_time, 2, offset=3) + ["2025-03-19 13:00:00,000 - INFO - IP: 127.0.0.1 - Met"])
+    assert ingester.ingest() == 2
+
+    resumed = LogIngester(log_file)
+    assert resumed.checkpoint_file == str(tmp_path / "logs_app.log.checkpoint.json")
+    assert resumed.ingest() == 0
+    assert resumed.aggregator.to_dict() == ingester.aggregator.to_dict()
+
+
+def test_ingest_finishes_the_rotated_file_first(write_log, tmp_path, start_time):
+    log_file = write_log(tasks_lines(start_time, 2))
+    ingester = LogIngester(log_file)
+    ingester.ingest()
+    write_log(tasks_lines(start_time, 1, offset=2))
+    os.replace(log_file, log_file + ".1")
+    write_log(tasks_lines(start_time, 2, offset=3))
+
+    assert ingester.ingest() == 3
+    assert sum(ingester.aggregator.feature_counts.values()) == 5
+
+
+def test_ingest_restarts_a_truncated_file(write_log, start_time):
+    log_file = write_log(tasks_lines(start_time, 4))
+    ingester = LogIngester(log_file)
+    ingester.ingest()
+    write_log(tasks_lines(start_time, 1, offset=4), mode="w")
+
+    assert ingester.ingest() == 1
+    assert sum(ingester.aggregator.feature_counts.values()) == 5
+
+
+def test_checkpoint_path_does_not_follow_the_working_directory(write_log, tmp_path, monkeypatch, start_time):
+    monkeypatch.chdir(tmp_path)
+    ingester = LogIngester("logs_app.log")
+    write_log(tasks_lines(start_time, 1))
+    monkeypatch.chdir("/")
+    assert ingester.ingest() == 1
+    assert os.path.exists(tmp_path / "logs_app.log.checkpoint.json")
+
+
+def test_features_come_from_route_templates(monkeypatch):
+    from fastapi import FastAPI
+
+    from app.services import analytics
+
+    app = FastAPI()
+    app.get("/users/{user_id}/tasks")(lambda user_id: None)
+    app.get("/users/{user_id}/{subject:path}/flash")(lambda user_id, subject: None)
+    app.post("/tasks/")(lambda: None)
+    monkeypatch.setattr(analytics, "ROUTE_PATTERNS", [])
+
+    # Sin plantillas registradas, las líneas antiguas usan el esquema de get_key_url
+    assert analytics.feature_for("GET", "http://testserver/users/1/tasks", None) == "users tasks"
+    analytics.register_routes(app.routes)
+    assert analytics.feature_for("GET", "http://testserver/users/5f1/tasks?x=1", None) == "users tasks"
+    assert analytics.feature_for("GET", "http://testserver/users/1/math/unit/flash", None) == "users flashcards"
+    assert analytics.feature_for("POST", "http://testserver/tasks/", "/tasks/") == "tasks"
+    assert analytics.feature_for("GET", "http://testserver/nowhere", None) == ""
+    assert analytics.feature_for("GET", "http://testserver/nowhere", "") == ""
+
+
+def test_latency_histogram_percentiles_and_merge():
+    histogram = LatencyHistogram()
+    for duration_ms in range(1, 101):
+        histogram.add(float(duration_ms))
+
+    summary = histogram.summary()
+    # Cada percentil es el límite superior de su bucket: a lo sumo ~19% por encima del real
+    assert 50 <= summary["p50"] <= 50 * 2 ** 0.25
+    assert 99 <= summary["p99"] <= 100
+    assert (summary["count"], summary["max"]) == (100, 100.0)
+
+    other = LatencyHistogram()
+    other.add(120000.0)
+    merged = LatencyHistogram.from_list(histogram.to_list()).merge(other)
+    assert merged.total == 101 and merged.percentile(1.0) == 120000.0
+
+
+def test_latency_rollups_answer_windows(start_time):
+    rollups = RollupStore()
+    rollups.add_latency(start_time, "/tasks", 10.0)
+    rollups.add_latency(start_time + hours(1), "/tasks", 1000.0)
+
+    window = rollups.query_latency(start_time, start_time + hours(1))
+    assert window["/tasks"].total == 1 and window["/tasks"].max == 10.0
+    assert rollups.query_latency()["/tasks"].total == 2
+
+
+def test_one_pass_feeds_every_chart(start_time):
+    day = timedelta(days=1)
+    records = [
+        (start_time, "PUT", "/schedules/s1", 200, "/schedules/{schedule_id}"),
+        (start_time + day, "PUT", "/schedules/s1", 200, "/schedules/{schedule_id}"),
+        (start_time + 10 * day, "PUT", "/schedules/s1", 200, "/schedules/{schedule_id}"),
+        (start_time, "GET", "/users/u1/math/flash", 200, "/users/{user_id}/{subject:path}/flash"),
+        (start_time, "POST", "/meetings/", 200, "/meetings/"),
+        (start_time, "POST", "/reminders/", 200, "/reminders/"),
+        (start_time, "DELETE", "/reminders/r1", 404, "/reminders/{reminder_id}"),
+    ]
+    aggregator = DashboardAggregator().consume(
+        {"timestamp": timestamp, "method": method, "url": f"http://testserver{url}", "response": status, "route": route, "duration_ms": 1.0}
+        for timestamp, method, url, status, route in records
+    )
+
+    assert aggregator.update_patterns == {"daily": 1, "weekly": 0, "monthly": 1}
+    assert aggregator.flashcard_hours[8] == 1 and aggregator.subject_counts == {"math": 1}
+    assert aggregator.meeting_hours[8] == 1
+    assert (aggregator.reminder_creates, aggregator.reminder_deletes) == (1, 0)
+    assert aggregator.fail_counts == {"reminders deletion": 1}
+    assert aggregator.usage_counts["schedules modification"] == 3
+    assert aggregator.generation == len(records)
+    assert DashboardAggregator.from_dict(aggregator.to_dict()).to_dict() == aggregator.to_dict()
+
+
+def test_checkpoint_is_written_through_a_per_process_temp_file(write_log, tmp_path, start_time, monkeypatch):
+    replaced = []
+    real_replace = os.replace
+    monkeypatch.setattr(os, "replace", lambda source, target: replaced.append(source) or real_replace(source, target))
+    ingester = LogIngester(write_log(tasks_lines(start_time, 1)))
+    ingester.ingest()
+
+    assert replaced == [f"{ingester.checkpoint_file}.{os.getpid()}.tmp"]
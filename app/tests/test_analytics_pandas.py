@@ -0,0 +1,78 @@
+import os
+from datetime import timedelta
+
+import pytest
+
+from app.services.analytics import DashboardAggregator, LogIngester, parse_logs
+from app.tests.conftest import log_line
+
+pytest.importorskip("pandas")
+from app.services.analytics_pandas import FrameAggregator  # noqa: E402
+
+METHODS = ["GET", "POST", "PUT", "DELETE"]
+
+
+def synthetic_log(start, features):
+    lines = []
+    timestamp = start
+    for index in range(features):
+        for method in METHODS:
+            for status in (200, 404, 500):
+                timestamp += timedelta(minutes=7)
+                lines.append(log_line(timestamp, method, f"/feature{index}/abc", status, f"/feature{index}/{{item_id}}", 1.5 + index))
+    # Líneas que alimentan los gráficos de horarios, flashcards, reuniones y reminders
+    for day in (0, 1, 5, 20):
+        lines.append(log_line(start + timedelta(days=day), "PUT", "/schedules/s1", 200, "/schedules/{schedule_id}", 3.0))
+    lines.append(log_line(start + timedelta(hours=3), "GET", "/users/u1/math/flash", 200, "/users/{user_id}/{subject:path}/flash", 40.0))
+    lines.append(log_line(start + timedelta(hours=4), "POST", "/meetings/", 200, "/meetings/", 2.0))
+    lines.append(log_line(start + timedelta(hours=5), "POST", "/reminders/", 200, "/reminders/", 2.0))
+    lines.append(log_line(start + timedelta(hours=6), "DELETE", "/reminders/r1", 200, "/reminders/{reminder_id}", 2.0))
+    # Línea antigua sin ruta ni duración
+    lines.append(log_line(start + timedelta(hours=7), "GET", "/notes/n1", 200))
+    return lines
+
+
+def summary(aggregator):
+    return {
+        "fail_counts": dict(aggregator.fail_counts),
+        "usage_counts": dict(aggregator.usage_counts),
+        "feature_counts": dict(aggregator.feature_counts),
+        "update_patterns": aggregator.update_patterns,
+        "flashcard_hours": list(aggregator.flashcard_hours),
+        "subject_counts": dict(aggregator.subject_counts),
+        "meeting_hours": list(aggregator.meeting_hours),
+        "reminder_creates": aggregator.reminder_creates,
+        "reminder_deletes": aggregator.reminder_deletes,
+        "rollups": aggregator.rollups.to_dict(),
+    }
+
+
+@pytest.mark.parametrize("features", [3, 60])
+def test_pandas_backend_matches_stream_backend(write_log, start_time, features):
+    # Con más de 32 features los pares (feature, acción) pasan de 127 códigos
+    log_file = write_log(synthetic_log(start_time, features))
+
+    stream = DashboardAggregator().consume(parse_logs(log_file))
+    frame = FrameAggregator.from_log(log_file)
+
+    assert summary(frame) == summary(stream)
+    assert len(frame.usage_counts) == features * 3 + 6
+
+
+def test_backends_match_after_log_rotation(write_log, tmp_path, start_time):
+    lines = synthetic_log(start_time, 4)
+    log_file = write_log(lines[:20])
+    ingester = LogIngester(log_file, str(tmp_path / "checkpoint.json"))
+    ingester.ingest()
+
+    # Dos rotaciones como las de BatchedLogWriter: <log>.1 pasa a <log>.2 y el log actual a <log>.1
+    for chunk in (lines[20:40], lines[40:]):
+        if os.path.exists(log_file + ".1"):
+            os.replace(log_file + ".1", log_file + ".2")
+        os.replace(log_file, log_file + ".1")
+        write_log(chunk)
+        ingester.ingest()
+    (tmp_path / "logs_app.log.lock").touch()
+
+    assert summary(FrameAggregator.from_log(log_file)) == summary(ingester.aggregator)
+    assert sum(ingester.aggregator.feature_counts.values()) == len(lines)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.cache import users_cache
+from app.config import settings
+from app.routes import note_routes, task_routes
+
+
+def client(*routers):
+    app = FastAPI()
+    for router in routers:
+        app.include_router(router)
+    return TestClient(app)
+
+
+def test_bulk_insert_reports_every_item(mongo):
+    user_id = ObjectId()
+    mongo.users.insert_one({"_id": user_id, "tasks": []})
+    mongo.tasks.create_index("title", unique=True)
+    users_cache.clear()
+    items = [
+        {"title": "a", "user_id": "u"},
+        {"title": "b"},  # falta user_id
+        {"title": "a", "user_id": "u"},  # clave duplicada
+        {"title": "c", "user_id": "u", "priority": "high"},
+    ]
+
+    response = client(task_routes.router).post(f"/tasks/bulk?user_id={user_id}", json=items)
+
+    body = response.json()
+    assert response.status_code == 200
+    assert (body["inserted"], body["failed"]) == (2, 2)
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    assert body["results"][1]["error"][0]["loc"] == ["user_id"]
+    assert "E11000" in body["results"][2]["error"]
+    created = [body["results"][0]["_id"], body["results"][3]["_id"]]
+    assert sorted(task["title"] for task in mongo.tasks.find()) == ["a", "c"]
+    assert mongo.users.find_one({"_id": user_id})["tasks"] == created
+
+
+def test_bulk_insert_checks_owner_and_size(mongo, monkeypatch):
+    users_cache.clear()
+    http = client(task_routes.router)
+    assert http.post(f"/tasks/bulk?user_id={ObjectId()}", json=[{"title": "a", "user_id": "u"}]).status_code == 404
+
+    monkeypatch.setattr(settings, "bulk_max_items", 2)
+    assert http.post("/tasks/bulk", json=[{"title": str(i), "user_id": "u"} for i in range(3)]).status_code == 400
+    assert mongo.tasks.count_documents({}) == 0
+
+
+def test_bulk_notes_are_stamped_in_utc(mongo):
+    now = datetime(2025, 1, 1).isoformat()
+    note = {"title": "t", "subject": "s", "content": "c", "owner_id": "u", "created_date": now, "last_modified": now}
+
+    body = client(note_routes.router).post("/notes/bulk", json=[note]).json()
+
+    assert body["inserted"] == 1
+    stored = mongo.notes.find_one()
+    assert stored["created_date"] > datetime(2025, 1, 2)
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from app import coalescing
+from app.cache import DocumentCache
+from app.database import database
+from app.tests.conftest import SlowCollection
+
+
+@pytest.fixture
+def user(mongo):
+    user_id = ObjectId()
+    mongo.users.insert_one({"_id": user_id, "name": "Ana", "tasks": []})
+    return mongo, str(user_id)
+
+
+def test_hits_return_copies_without_querying(user):
+    mongo, user_id = user
+    cache = DocumentCache("users", ttl=60)
+
+    async def run():
+        first = await cache.get(user_id)
+        first["tasks"].append("mutated")
+        return await cache.get(user_id), await cache.get(ObjectId(user_id))
+
+    second, third = asyncio.run(run())
+    assert second["tasks"] == [] and third == second
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert database["users"].calls == ["find_one"]
+
+
+def test_missing_documents_are_cached_too(user):
+    cache = DocumentCache("users", ttl=60)
+    missing = str(ObjectId())
+
+    async def run():
+        return await cache.get(missing), await cache.get(missing)
+
+    assert asyncio.run(run()) == (None, None)
+    assert database["users"].calls == ["find_one"]
+
+
+def test_ttl_invalidation_and_lru(user):
+    mongo, user_id = user
+    others = [str(mongo.users.insert_one({"name": str(i)}).inserted_id) for i in range(2)]
+
+    async def run():
+        expired = DocumentCache("users", ttl=0)
+        await expired.get(user_id)
+        await expired.get(user_id)
+        assert expired.misses == 2
+
+        cache = DocumentCache("users", ttl=60, max_entries=2)
+        await cache.get(user_id)
+        mongo.users.update_one({"_id": ObjectId(user_id)}, {"$set": {"name": "Eva"}})
+        assert (await cache.get(user_id))["name"] == "Ana"
+        cache.invalidate(user_id)
+        assert (await cache.get(user_id))["name"] == "Eva"
+
+        await cache.get(others[0])
+        await cache.get(user_id)  # user_id pasa a ser el más reciente
+        await cache.get(others[1])
+        return list(cache._entries)
+
+    assert asyncio.run(run()) == [user_id, others[1]]
+
+
+def test_lookup_in_flight_during_invalidation_is_not_stored():
+    user_id = str(ObjectId())
+    collection = SlowCollection({"_id": ObjectId(user_id), "name": "old"})
+    cache = DocumentCache("users", ttl=60)
+    cache.collection = collection
+
+    async def run():
+        collection.release = asyncio.Event()
+        lookup = asyncio.ensure_future(cache.get(user_id))
+        await asyncio.sleep(0)
+        cache.invalidate(user_id)
+        collection.release.set()
+        await lookup
+        return user_id in cache._entries
+
+    coalescing._in_flight.clear()
+    assert asyncio.run(run()) is False
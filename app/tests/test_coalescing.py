@@ -0,0 +1,40 @@
+import asyncio
+
+from app import coalescing
+from app.tests.conftest import SlowCollection
+
+
+def test_concurrent_identical_reads_share_one_query():
+    collection = SlowCollection({"_id": 1})
+
+    async def run():
+        collection.release = asyncio.Event()
+        reads = [asyncio.ensure_future(coalescing.find_one(collection, {"_id": 1})) for _ in range(5)]
+        other = asyncio.ensure_future(coalescing.find_one(collection, {"_id": 1}, {"name": 1}))
+        await asyncio.sleep(0)
+        # Cancelar a uno no cancela la consulta de los demás
+        reads[0].cancel()
+        collection.release.set()
+        return await asyncio.gather(*reads[1:], other)
+
+    results = asyncio.run(run())
+    assert results == [{"_id": 1}] * 5
+    assert collection.calls == 2
+    assert coalescing._in_flight == {}
+
+
+def test_forget_starts_a_new_read():
+    collection = SlowCollection({"_id": 1})
+
+    async def run():
+        collection.release = asyncio.Event()
+        before = asyncio.ensure_future(coalescing.find_one(collection, {"_id": 1}))
+        await asyncio.sleep(0)
+        coalescing.forget(collection, {"_id": 1})
+        after = asyncio.ensure_future(coalescing.find_one(collection, {"_id": 1}))
+        await asyncio.sleep(0)
+        collection.release.set()
+        await asyncio.gather(before, after)
+
+    asyncio.run(run())
+    assert collection.calls == 2
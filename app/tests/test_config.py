@@ -0,0 +1,49 @@
+import pytest
+
+from app import database
+from app.config import Settings
+
+
+def test_settings_read_the_dotenv_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    monkeypatch.setenv("LOG_BATCH_SIZE", "64")
+    (tmp_path / ".env").write_text("ADMIN_TOKEN=from-dotenv\nMETRICS_MULTIPROC_DIR=/tmp/metrics\nLOG_BATCH_SIZE=32\n")
+
+    settings = Settings()
+
+    assert settings.admin_token == "from-dotenv"
+    assert settings.metrics_multiproc_dir == "/tmp/metrics"
+    # El entorno tiene prioridad sobre .env
+    assert settings.log_batch_size == 64
+
+
+def test_collections_resolve_against_the_connected_client(mongo):
+    users = database.database["users"]
+    assert database.database["users"] is users
+
+    mongo.users.insert_one({"name": "Ana"})
+    assert users.name == "users"
+    assert users._resolve()._collection.find_one()["name"] == "Ana"
+
+
+def test_collections_fail_clearly_before_connect(monkeypatch):
+    monkeypatch.setattr(database, "client", None)
+    with pytest.raises(RuntimeError, match="not connected"):
+        database.database["users"].find_one
+
+
+def test_connect_is_idempotent_and_close_resets(monkeypatch):
+    monkeypatch.setattr(database, "client", None)
+    client = database.connect()
+    try:
+        assert database.connect() is client
+    finally:
+        database.close()
+    assert database.client is None
+
+
+def test_client_options_only_include_what_is_set():
+    options = Settings(mongo_max_pool_size=20, mongo_compressors="zstd,zlib").mongo_client_options()
+    assert options["maxPoolSize"] == 20 and options["compressors"] == "zstd,zlib"
+    assert "maxIdleTimeMS" not in options and "waitQueueTimeoutMS" not in options
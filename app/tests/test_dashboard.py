@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+from datetime import timedelta
+
+import pytest
+
+import charts
+from app.services import dashboard
+from app.services.analytics import LogIngester
+from app.tests.conftest import log_line
+
+
+def lines(start, count):
+    return [log_line(start + timedelta(minutes=i), "GET", f"/notes/{i}", 200, "/notes/{note_id}", 2.0) for i in range(count)]
+
+
+@pytest.fixture
+def renders(monkeypatch, write_log, tmp_path, start_time):
+    # Backend "stream" sobre un log temporal; cada render anota cuántos requests vio
+    log_file = write_log(lines(start_time, 3))
+    monkeypatch.setattr(charts, "ANALYTICS_BACKEND", "stream")
+    monkeypatch.setattr(charts, "ingester", LogIngester(log_file, str(tmp_path / "checkpoint.json")))
+    renders = []
+
+    def render(aggregator):
+        time.sleep(0.02)
+        renders.append(sum(aggregator.feature_counts.values()))
+        return [str(renders[-1])]
+
+    monkeypatch.setattr(dashboard, "construir_graficos", render)
+    return log_file, renders
+
+
+def test_window_query_does_not_leave_cached_dashboard_stale(renders, write_log, start_time):
+    log_file, renders = renders
+    builder = dashboard.DashboardBuilder(log_file, ttl=0)
+    assert builder._refresh() == ["3"]
+
+    # La consulta por ventana ingiere las líneas nuevas antes que el refresco del dashboard
+    write_log(lines(start_time + timedelta(hours=1), 2))
+    series = builder._window(start_time, start_time + timedelta(hours=2), "hour")
+    assert [sum(row.values()) for _, row in series] == [3, 2]
+
+    assert builder._refresh() == ["5"]
+    # Sin líneas nuevas no se vuelve a renderizar
+    builder._refresh()
+    assert renders == [3, 5]
+
+
+def test_window_snaps_to_whole_hours(start_time):
+    start, end = dashboard.resolve_window(start_time + timedelta(minutes=30), start_time + timedelta(hours=2, seconds=1))
+    assert (start, end) == (start_time, start_time + timedelta(hours=3))
+    assert dashboard.resolve_window(start_time, start_time + timedelta(hours=2)) == (start_time, start_time + timedelta(hours=2))
+
+
+def test_concurrent_visitors_share_one_build(renders):
+    log_file, renders = renders
+    builder = dashboard.DashboardBuilder(log_file, ttl=60)
+
+    async def visit():
+        return await asyncio.gather(*(builder.get() for _ in range(5)))
+
+    assert asyncio.run(visit()) == [["3"]] * 5
+    assert renders == [3]
+
+
+def test_stale_dashboard_is_served_while_it_refreshes(renders, write_log, start_time):
+    log_file, renders = renders
+    builder = dashboard.DashboardBuilder(log_file, ttl=60)
+
+    async def visits():
+        first = await builder.get()
+        write_log(lines(start_time + timedelta(hours=1), 2))
+        # Dentro del TTL no se mira el log
+        within_ttl = await builder.get()
+        builder._checked_at -= 60
+        stale = await builder.get()
+        await builder._in_flight
+        return first, within_ttl, stale, await builder.get()
+
+    assert asyncio.run(visits()) == (["3"], ["3"], ["3"], ["5"])
+    assert renders == [3, 5]
+
+
+def test_window_queries_beyond_the_limit_are_rejected(renders, start_time, monkeypatch):
+    from fastapi import HTTPException
+
+    log_file, _ = renders
+    builder = dashboard.DashboardBuilder(log_file, ttl=60, max_window_requests=2)
+    release = threading.Event()
+    monkeypatch.setattr(builder, "_window", lambda *args: release.wait(2) and [])
+
+    async def burst():
+        window = (start_time, start_time + timedelta(hours=1), "hour")
+        running = [asyncio.ensure_future(builder.window(*window)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        try:
+            await builder.window_graficos(*window)
+        except HTTPException as e:
+            rejected = e.status_code
+        release.set()
+        await asyncio.gather(*running)
+        return rejected, builder._window_requests
+
+    assert asyncio.run(burst()) == (503, 0)
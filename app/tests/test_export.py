@@ -0,0 +1,47 @@
+import gzip
+
+import pytest
+from bson import Decimal128, ObjectId, json_util
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import export_routes
+from app.services import profiling
+
+
+@pytest.fixture
+def http(mongo, monkeypatch):
+    monkeypatch.setattr(profiling, "ADMIN_TOKEN", "secret")
+    app = FastAPI()
+    app.include_router(export_routes.router)
+    mongo.users.insert_many([{"_id": ObjectId(), "name": str(i), "password": "x", "balance": Decimal128("1.10")} for i in range(5)])
+    return TestClient(app, headers={"X-Admin-Token": "secret"})
+
+
+def ndjson(data):
+    return [json_util.loads(line) for line in data.decode().splitlines()]
+
+
+def test_export_streams_every_document_in_id_order(mongo, http):
+    response = http.get("/export/users", params={"batch_size": 2})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    documents = ndjson(response.content)
+    assert documents == sorted(mongo.users.find({}, {"password": 0}), key=lambda document: document["_id"])
+    assert documents[0]["balance"] == Decimal128("1.10")
+
+
+def test_export_resumes_and_compresses(mongo, http):
+    ids = sorted(document["_id"] for document in mongo.users.find())
+
+    response = http.get("/export/users", params={"after": str(ids[2]), "gzip": True})
+
+    assert response.headers["content-disposition"] == 'attachment; filename="users.ndjson.gz"'
+    assert [document["_id"] for document in ndjson(gzip.decompress(response.content))] == ids[3:]
+
+
+def test_export_rejects_bad_requests(http):
+    assert http.get("/export/users", headers={"X-Admin-Token": "wrong"}).status_code == 403
+    assert http.get("/export/secrets").status_code == 404
+    assert http.get("/export/users", params={"after": "nope"}).status_code == 400
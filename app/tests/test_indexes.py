@@ -0,0 +1,24 @@
+import asyncio
+import logging
+
+from app.indexes import INDEXES, ensure_indexes
+
+
+def test_every_declared_index_is_created(mongo):
+    asyncio.run(ensure_indexes())
+
+    for name, indexes in INDEXES.items():
+        existing = {tuple(index["key"]) for index in mongo[name].index_information().values()}
+        for index in indexes:
+            assert tuple(index.document["key"].items()) in existing, (name, index.document["name"])
+    assert mongo.users.index_information()["email_1"]["unique"]
+
+
+def test_a_failing_collection_does_not_stop_the_rest(mongo, caplog):
+    mongo.users.insert_many([{"email": "a@x"}, {"email": "a@x"}])
+
+    with caplog.at_level(logging.ERROR):
+        asyncio.run(ensure_indexes())
+
+    assert "Could not create indexes on users" in caplog.text
+    assert "created_date_1__id_1" in mongo.notes.index_information()
@@ -0,0 +1,54 @@
+import asyncio
+
+from bson import ObjectId
+
+from app.cache import DocumentCache
+from app.database import database
+from app.loaders import current_loaders, forget, loader
+
+
+def in_request(coroutine):
+    async def run():
+        current_loaders.set({})
+        return await coroutine
+
+    return asyncio.run(run())
+
+
+def test_concurrent_loads_share_one_query(mongo):
+    first, second = ObjectId(), ObjectId()
+    mongo.tasks.insert_many([{"_id": first}, {"_id": second}])
+
+    async def load():
+        return await asyncio.gather(loader("tasks").load(first), loader("tasks").load(str(second)), loader("tasks").load(first), loader("tasks").load(ObjectId()))
+
+    documents = in_request(load())
+    assert [document and document["_id"] for document in documents] == [first, second, first, None]
+    assert database["tasks"].calls == ["find"]
+
+
+def test_forget_after_a_write_reloads_the_document(mongo):
+    task_id = ObjectId()
+    mongo.tasks.insert_one({"_id": task_id, "title": "old"})
+
+    async def update():
+        await loader("tasks").load(task_id)
+        await database["tasks"].update_one({"_id": task_id}, {"$set": {"title": "new"}})
+        forget("tasks", task_id)
+        return await loader("tasks").load(task_id)
+
+    assert in_request(update())["title"] == "new"
+
+
+def test_cache_invalidation_also_forgets_the_loaded_copy(mongo):
+    user_id = ObjectId()
+    mongo.users.insert_one({"_id": user_id, "name": "old"})
+    cache = DocumentCache("users")
+
+    async def update():
+        await loader("users").load(user_id)
+        await database["users"].update_one({"_id": user_id}, {"$set": {"name": "new"}})
+        cache.invalidate(user_id)
+        return await loader("users").load(user_id)
+
+    assert in_request(update())["name"] == "new"
@@ -0,0 +1,52 @@
+import logging
+import queue
+
+from app.services.analytics import parse_logs
+from app.services.log_pipeline import BatchedLogWriter, QueueingHandler
+
+
+def make_writer(path, records=None, **options):
+    records = records or queue.Queue(maxsize=100)
+    handler = QueueingHandler(records)
+    handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    return BatchedLogWriter(str(path), records, handler, **options), handler
+
+
+def record(message):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, message, None, None)
+
+
+def test_lines_are_written_in_the_readers_encoding(tmp_path):
+    path = tmp_path / "app.log"
+    writer, _ = make_writer(path)
+    writer._write([record("Method: GET - URL: http://testserver/notes/ñandú€ - Body: False Response: 200")])
+    writer._file.close()
+
+    raw = path.read_bytes()
+    assert "ñandú".encode("latin1") in raw and b"\\u20ac" in raw
+    assert [entry["url"] for entry in parse_logs(str(path))] == ["http://testserver/notes/ñandú\\u20ac"]
+
+
+def test_workers_sharing_a_file_follow_each_others_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    first, _ = make_writer(path, max_bytes=250, backup_count=3)
+    second, _ = make_writer(path, max_bytes=250, backup_count=3)
+    for writer in (first, first, first, second):
+        writer._write([record("x" * 80)])
+
+    # Caben dos líneas por archivo: first rotó y second escribe en el archivo nuevo, no en el backup
+    assert path.read_text("latin1").count("x" * 80) == 2
+    assert (tmp_path / "app.log.1").read_text("latin1").count("x" * 80) == 2
+    assert not (tmp_path / "app.log.2").exists()
+
+
+def test_stop_does_not_block_on_a_full_queue(tmp_path):
+    records = queue.Queue(maxsize=2)
+    writer, _ = make_writer(tmp_path / "app.log", records, flush_interval=0.05)
+    records.put_nowait(record("one"))
+    records.put_nowait(record("two"))
+    writer.start()
+    writer.stop(timeout=2)
+
+    assert not writer.is_alive()
+    assert (tmp_path / "app.log").read_text("latin1").count("INFO") == 2
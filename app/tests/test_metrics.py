@@ -0,0 +1,71 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+
+from app.services import metrics as metrics_module
+from app.services.metrics import WorkerMetrics, merge_snapshots
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def write_snapshot(directory, pid, in_flight):
+    path = directory / f"{pid}.json"
+    path.write_text(json.dumps({
+        "counters": {"http_requests_total\tmethod=\"GET\"": 3},
+        "gauges": {"http_requests_in_flight\t": in_flight},
+        "histograms": {},
+        "sums": {},
+    }))
+    return path
+
+
+def test_dead_workers_keep_counters_but_not_gauges(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_module, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    write_snapshot(tmp_path, dead_pid(), 4)
+    # Un worker vivo pero ocioso conserva sus gauges aunque su snapshot sea antiguo
+    idle = write_snapshot(tmp_path, os.getppid(), 2)
+    os.utime(idle, (0, 0))
+
+    counters, gauges, _, _ = merge_snapshots(WorkerMetrics().collect())
+
+    assert counters["http_requests_total\tmethod=\"GET\""] == 6
+    assert gauges["http_requests_in_flight\t"] == 2
+
+
+def test_in_flight_requests_are_published_without_finishing(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_module, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    monkeypatch.setattr(metrics_module, "SNAPSHOT_INTERVAL", 0.01)
+    worker = WorkerMetrics()
+
+    async def run():
+        worker.request_started()
+        worker.record_threadsafe("gauge_add", "mongo_pool_connections", "", 1)
+        await asyncio.sleep(0.05)
+        started = json.loads((tmp_path / f"{os.getpid()}.json").read_text())["gauges"]
+        publisher = asyncio.ensure_future(worker.publish_snapshots())
+        worker.record_threadsafe("gauge_add", "mongo_pool_connections", "", 1)
+        await asyncio.sleep(0.05)
+        publisher.cancel()
+        return started, json.loads((tmp_path / f"{os.getpid()}.json").read_text())["gauges"]
+
+    started, published = asyncio.run(run())
+    assert started == {"http_requests_in_flight\t": 1, "mongo_pool_connections\t": 1}
+    assert published["mongo_pool_connections\t"] == 2
+
+
+def test_startup_removes_snapshots_of_dead_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_module, "METRICS_MULTIPROC_DIR", str(tmp_path))
+    dead = write_snapshot(tmp_path, dead_pid(), 1)
+    alive = write_snapshot(tmp_path, os.getppid(), 1)
+    (tmp_path / "123.json.tmp").write_text("{")
+
+    WorkerMetrics().remove_dead_snapshots()
+
+    assert sorted(tmp_path.iterdir()) == [alive]
+    assert not dead.exists()
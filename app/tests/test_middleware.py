@@ -0,0 +1,71 @@
+import logging
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.middleware import RequestLogMiddleware
+from app.services.analytics import parse_line
+
+
+@pytest.fixture
+def http():
+    app = FastAPI()
+    app.add_middleware(RequestLogMiddleware)
+
+    @app.post("/items/{item_id}")
+    async def update(item_id: str, request: Request):
+        await request.body()
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom():
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+def request_lines(caplog):
+    return [record.getMessage() for record in caplog.records if record.getMessage().startswith("IP: ")]
+
+
+def test_one_parseable_line_per_request(http, caplog):
+    with caplog.at_level(logging.INFO):
+        http.post("/items/7", content=b"payload")
+        http.post("/items/8")
+        http.get("/boom")
+        http.get("/missing")
+
+    lines = request_lines(caplog)
+    assert len(lines) == 4
+    records = [parse_line(f"2025-03-19 08:00:00,000 - INFO - {line}") for line in lines]
+    assert [(r["method"], r["response"], r["route"]) for r in records] == [
+        ("POST", 200, "/items/{item_id}"), ("POST", 200, "/items/{item_id}"), ("GET", 500, "/boom"), ("GET", 404, ""),
+    ]
+    assert [" - Body: True " in lines[0], " - Body: False " in lines[1]] == [True, True]
+    assert all(record["duration_ms"] is not None for record in records)
+
+
+def test_query_stats_in_server_timing_and_budget_warning(monkeypatch, caplog):
+    from app.services import query_stats
+
+    app = FastAPI()
+    app.add_middleware(RequestLogMiddleware)
+
+    @app.get("/chatty/{count}")
+    async def chatty(count: int):
+        # Lo que añadiría QueryStatsListener por cada comando terminado
+        listener = query_stats.QueryStatsListener()
+        for _ in range(count):
+            listener.succeeded(type("Event", (), {"command_name": "find", "duration_micros": 1500, "reply": {"cursor": {"firstBatch": [{}, {}]}}})())
+        return {}
+
+    monkeypatch.setattr(query_stats.QueryStats, "over_budget", lambda self, budget=3: self.commands > budget)
+    http = TestClient(app)
+    with caplog.at_level(logging.INFO):
+        timing = http.get("/chatty/2").headers["server-timing"]
+        http.get("/chatty/4")
+
+    assert timing == 'mongo;dur=3.00;desc="2 commands, 4 docs"'
+    warnings = [record.getMessage() for record in caplog.records if record.levelno == logging.WARNING]
+    assert len(warnings) == 1 and "/chatty/{count} made 4 commands" in warnings[0] and "find x4" in warnings[0]
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.routes import note_routes
+
+
+@pytest.fixture
+def http(mongo):
+    app = FastAPI()
+    app.include_router(note_routes.router)
+    return TestClient(app)
+
+
+def pages(http, **params):
+    seen, cursor = [], None
+    while True:
+        response = http.get("/notes/", params={**params, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        seen.append([note["_id"] for note in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return seen
+
+
+def test_pages_cover_the_collection_once_in_id_order(mongo, http):
+    ids = [ObjectId() for _ in range(7)]
+    mongo.notes.insert_many([{"_id": note_id} for note_id in reversed(ids)])
+
+    seen = pages(http, limit=3)
+
+    assert [len(page) for page in seen] == [3, 3, 1]
+    assert sum(seen, []) == [str(note_id) for note_id in ids]
+
+
+def test_sort_field_with_ties_and_missing_values(mongo, http):
+    day = datetime(2025, 1, 1)
+    dates = [day, None, day + timedelta(days=1), day, None, day + timedelta(days=2), day]
+    notes = [{"_id": ObjectId(), **({"created_date": date} if date else {})} for date in dates]
+    mongo.notes.insert_many(notes)
+
+    def expected(reverse):
+        ordered = sorted(notes, key=lambda note: (note.get("created_date") is not None, note.get("created_date") or day, note["_id"]), reverse=reverse)
+        return [str(note["_id"]) for note in ordered]
+
+    assert sum(pages(http, limit=2, sort="created_date"), []) == expected(False)
+    assert sum(pages(http, limit=2, sort="-created_date"), []) == expected(True)
+
+
+def test_invalid_sort_and_cursor(mongo, http):
+    mongo.notes.insert_many([{"_id": ObjectId()} for _ in range(3)])
+    cursor = http.get("/notes/", params={"limit": 1}).headers["X-Next-Cursor"]
+
+    assert http.get("/notes/", params={"sort": "title"}).status_code == 400
+    assert http.get("/notes/", params={"cursor": "garbage"}).status_code == 400
+    # Un cursor sólo vale para el orden con el que se emitió
+    assert http.get("/notes/", params={"cursor": cursor, "sort": "created_date"}).status_code == 400
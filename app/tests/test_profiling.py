@@ -0,0 +1,11 @@
+import logging
+
+from app.services.profiling import sample_rate
+
+
+def test_sampling_requires_admin_token(caplog):
+    with caplog.at_level(logging.WARNING):
+        assert sample_rate(None, 0.1) == 0
+    assert "ADMIN_TOKEN" in caplog.text
+    assert sample_rate("secret", 0.1) == 0.1
+    assert sample_rate(None, 0) == 0
@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+from fastapi import HTTPException
+
+from app.cache import DocumentCache
+from app.database import database
+from app.relationships import Relationship
+
+
+def ids(count):
+    return [str(ObjectId()) for _ in range(count)]
+
+
+@pytest.fixture
+def board(mongo):
+    owner, (first, second, third) = ObjectId(), ids(3)
+    mongo.tasks.insert_many([{"_id": ObjectId(first)}, {"_id": ObjectId(third)}])
+    mongo.users.insert_one({"_id": owner, "tasks": [first, second, third], "open_tasks": [second]})
+    relationship = Relationship(
+        database["users"], DocumentCache("users"), "tasks", lambda task_id: database["tasks"].find_one({"_id": ObjectId(task_id)}),
+        "User", "Task", linked="Task already assigned to user", not_linked="Task not assigned to user",
+        also=("open_tasks",), targets=database["tasks"],
+    )
+    return mongo, relationship, str(owner), (first, second, third)
+
+
+def status(coroutine):
+    try:
+        asyncio.run(coroutine)
+    except HTTPException as e:
+        return e.status_code, e.detail
+    return 200, None
+
+
+def test_unlink_of_missing_target_is_undone_in_place(board):
+    mongo, relationship, owner, (first, second, third) = board
+    # second está en la lista pero la tarea ya no existe
+    assert status(relationship.unlink(owner, second)) == (404, "Task not found")
+    user = mongo.users.find_one()
+    assert user["tasks"] == [first, second, third]
+    assert user["open_tasks"] == [second]
+
+
+def test_link_of_missing_target_is_undone(board):
+    mongo, relationship, owner, tasks = board
+    assert status(relationship.link(owner, str(ObjectId()))) == (404, "Task not found")
+    assert mongo.users.find_one()["tasks"] == list(tasks)
+
+
+def test_link_can_keep_a_route_specific_missing_detail(board):
+    _, relationship, owner, _ = board
+    relationship.link_missing = "task not found"
+    assert status(relationship.link(owner, str(ObjectId()))) == (404, "task not found")
+    assert status(relationship.unlink(owner, str(ObjectId()))) == (404, "Task not found")
+
+
+def test_preconditions(board):
+    mongo, relationship, owner, (first, second, third) = board
+    assert status(relationship.link(owner, first)) == (400, "Task already assigned to user")
+    assert status(relationship.unlink(owner, first)) == (200, None)
+    assert status(relationship.unlink(owner, first)) == (400, "Task not assigned to user")
+    assert status(relationship.link(owner, first)) == (200, None)
+    assert mongo.users.find_one()["tasks"] == [second, third, first]
+    assert status(relationship.link(str(ObjectId()), first)) == (404, "User not found")
+
+
+def test_invalid_ids_are_not_found(board):
+    _, relationship, owner, (first, _, _) = board
+    assert status(relationship.link("not-an-id", first)) == (404, "User not found")
+    assert status(relationship.unlink(owner, "not-an-id")) == (404, "Task not found")
+    assert status(relationship.link_many("not-an-id", [first])) == (404, "User not found")
+    assert status(relationship.unlink_many(None, [first])) == (404, "User not found")
+
+
+def test_link_and_unlink_many_report_each_id(board):
+    mongo, relationship, owner, (first, second, third) = board
+    fresh = str(ObjectId())
+    mongo.tasks.insert_one({"_id": ObjectId(fresh)})
+    missing = str(ObjectId())
+
+    result = asyncio.run(relationship.link_many(owner, [fresh, first, missing, "bad", fresh]))
+    assert result == {"added": [fresh], "already_present": [first], "missing": [missing, "bad"]}
+
+    result = asyncio.run(relationship.unlink_many(owner, [third, fresh, first]))
+    assert result == {"removed": [third, fresh, first], "not_present": [], "missing": []}
+    assert mongo.users.find_one()["tasks"] == [second]
+
+    result = asyncio.run(relationship.unlink_many(owner, [first]))
+    assert result == {"removed": [], "not_present": [first], "missing": []}
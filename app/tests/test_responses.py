@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+import orjson
+import pytest
+from bson import Decimal128, ObjectId
+
+from app.responses import BSONResponse
+
+
+def test_bson_types_are_serialized_at_any_depth():
+    object_id = ObjectId()
+    document = {
+        "_id": object_id,
+        "price": Decimal128("10.05"),
+        "created": datetime(2025, 3, 19, 8, 0, tzinfo=timezone.utc),
+        "members": [{"_id": object_id, "tags": ("a", "b")}],
+        1: "non-string key",
+    }
+
+    body = orjson.loads(BSONResponse(document).body)
+
+    assert body == {
+        "_id": str(object_id),
+        "price": "10.05",
+        "created": "2025-03-19T08:00:00+00:00",
+        "members": [{"_id": str(object_id), "tags": ["a", "b"]}],
+        "1": "non-string key",
+    }
+
+
+def test_unknown_types_still_fail():
+    with pytest.raises(TypeError):
+        BSONResponse({"value": object()})
@@ -0,0 +1,56 @@
+import os
+import time
+
+from app.services.telemetry import SegmentIngester, SegmentWriter, list_segments, read_segment
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def records(directory):
+    return [record for name in list_segments(directory) for _, record in read_segment(os.path.join(directory, name))]
+
+
+def test_tail_is_flushed_when_traffic_stops(tmp_path):
+    writer = SegmentWriter(str(tmp_path), flush_interval=0.05)
+    writer.append(time.time(), "GET", "/notes/{note_id}", "/notes/1", 200, 3.5)
+    try:
+        assert wait_for(lambda: len(records(str(tmp_path))) == 1)
+    finally:
+        writer.close()
+    [record] = records(str(tmp_path))
+    assert (record["method"], record["route"], record["url"], record["response"]) == ("GET", "/notes/{note_id}", "/notes/1", 200)
+
+
+def test_close_writes_what_is_queued(tmp_path):
+    writer = SegmentWriter(str(tmp_path), flush_interval=60)
+    for i in range(100):
+        writer.append(time.time(), "POST", "/notes", "/notes", 201, 1.0)
+    writer.close()
+    assert len(records(str(tmp_path))) == 100
+    assert [name.endswith(f"-{os.getpid()}.seg") for name in list_segments(str(tmp_path))] == [True]
+
+
+def test_ingester_follows_every_workers_segment(tmp_path):
+    directory = str(tmp_path)
+    first, second = SegmentWriter(directory, flush_interval=60), SegmentWriter(directory, flush_interval=60)
+    first._roll()
+    time.sleep(0.002)
+    second._roll()
+    ingester = SegmentIngester(directory, str(tmp_path / "checkpoint.json"))
+
+    # El segmento más antiguo sigue creciendo después de leer el más nuevo
+    second.append(time.time(), "GET", "/tasks", "/tasks", 200, 1.0)
+    second.close()
+    assert ingester.ingest() == 1
+    first.append(time.time(), "GET", "/tasks", "/tasks", 200, 1.0)
+    first.close()
+    assert ingester.ingest() == 1
+
+    resumed = SegmentIngester(directory, str(tmp_path / "checkpoint.json"))
+    assert resumed.ingest() == 0
+    assert sum(resumed.aggregator.feature_counts.values()) == 2
@@ -1,6 +1,7 @@
 import os
 import google.generativeai as genai
 from dotenv import load_dotenv
+from app.services.metrics import track_llm_call
 
 # Cargar variables desde el .env
 load_dotenv()
@@ -22,7 +23,8 @@ def generar_flashcards(texto):
         f"{texto}"
     )
     
-    response = model.generate_content(prompt).text.replace('*', '').strip()
+    with track_llm_call():
+        response = model.generate_content(prompt).text.replace('*', '').strip()
     if not response or ':' not in response or '$' not in response:
         return []
 
@@ -1,25 +1,55 @@
-from fastapi import FastAPI, Request
-from app.routes import document_routes, user_routes, task_routes, team_routes, kanban_board_routes, schedule_routes, flashcard_deck_routes, reminder_routes, calculator_routes, course_routes, friend_request_routes, note_routes, meeting_routes
+from fastapi import FastAPI, HTTPException, Query, Request
+from app.routes import document_routes, user_routes, task_routes, team_routes, kanban_board_routes, schedule_routes, flashcard_deck_routes, reminder_routes, calculator_routes, course_routes, friend_request_routes, note_routes, meeting_routes, admin_routes, export_routes
 
+import asyncio
 import logging
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Literal, Optional
+from app import database
+from app.config import settings
+from app.indexes import ensure_indexes
+from app.middleware import RequestLogMiddleware
+from app.responses import BSONResponse
+from app.services.log_pipeline import configure_logging
+from app.services.telemetry import SegmentWriter
 
 
-logging.basicConfig(
-    filename="logs_app.log", 
-    level=logging.INFO,  
-    format="%(asctime)s - %(levelname)s - %(message)s", 
+# Los registros pasan por una cola acotada y un hilo los escribe por lotes, rotando por tamaño
+configure_logging(
+    settings.log_file,
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
 )
 
 
+# El cliente de MongoDB vive lo mismo que la app
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.connect()
+    metrics.remove_dead_snapshots()
+    # Los índices se crean en segundo plano para no retrasar el arranque
+    index_bootstrap = asyncio.create_task(ensure_indexes())
+    # Con METRICS_MULTIPROC_DIR, el snapshot de este worker se publica cada SNAPSHOT_INTERVAL
+    snapshots = asyncio.create_task(metrics.publish_snapshots())
+    yield
+    snapshots.cancel()
+    index_bootstrap.cancel()
+    database.close()
+    # Escribe y vacía los registros de telemetría que quedaban en cola
+    if segment_writer:
+        segment_writer.close()
+
+
 # Inicializar la aplicación FastAPI
-app = FastAPI(title="Group33 Backend")
+# Por defecto las respuestas se serializan con orjson (entiende ObjectId y datetime)
+app = FastAPI(title="Group33 Backend", lifespan=lifespan, default_response_class=BSONResponse)
+
+# Si está configurado, además del log de texto cada request se guarda en segmentos binarios
+segment_writer = SegmentWriter(settings.telemetry_segments_dir) if settings.telemetry_segments_dir else None
 
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    body = await request.body()
-    response = await call_next(request)
-    logging.info(f"IP: {request.client.host} - Method: {request.method} - URL: {request.url} - Body: {True if body else False} Response: {response.status_code}")
-    return response
+# Middleware ASGI puro: no lee ni copia el body de los requests
+app.add_middleware(RequestLogMiddleware, segment_writer=segment_writer)
 
 # Incluir las rutas
 app.include_router(user_routes.router)
@@ -35,6 +65,8 @@ app.include_router(friend_request_routes.router)
 app.include_router(note_routes.router)
 app.include_router(meeting_routes.router)
 app.include_router(calculator_routes.router)
+app.include_router(admin_routes.router)
+app.include_router(export_routes.router)
 
 
 @app.get("/")
@@ -42,14 +74,70 @@ def root():
     return {"message": "🚀 API funcionando correctamente!"}
 
 
-from charts import generar_graficos
+from app.services.dashboard import dashboard_builder, resolve_window, window_summary
 from fastapi.templating import Jinja2Templates
 
+# Máximo de buckets que se combinan en una consulta por ventana
+MAX_WINDOW_BUCKETS = 24 * 366
+
+def dashboard_window(start, end, bucket):
+    start, end = resolve_window(start, end)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="'from' must be before 'to'")
+    if (end - start) / timedelta(hours=1 if bucket == "hour" else 24) > MAX_WINDOW_BUCKETS:
+        raise HTTPException(status_code=400, detail="Time window too large for this bucket")
+    return start, end
 
 templates = Jinja2Templates(directory="templates")
 @app.get("/dashboard")
-async def dashboard(request: Request):
-    graficos = generar_graficos()
+async def dashboard(
+    request: Request,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Optional[Literal["hour", "day"]] = None
+):
+    if start is None and end is None and bucket is None:
+        graficos = await dashboard_builder.get()
+    else:
+        bucket = bucket or "hour"
+        start, end = dashboard_window(start, end, bucket)
+        graficos = await dashboard_builder.window_graficos(start, end, bucket)
     return templates.TemplateResponse("dashboard.html", {"request": request, "graficos": graficos})
 
+# Conteos por bucket de tiempo, feature, método y clase de status
+@app.get("/dashboard/data")
+async def dashboard_data(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Literal["hour", "day"] = "hour"
+):
+    start, end = dashboard_window(start, end, bucket)
+    series = await dashboard_builder.window(start, end, bucket)
+    return window_summary(start, end, bucket, series)
+
+# p50/p90/p99/max por plantilla de ruta en la ventana (por defecto, las últimas 24 horas)
+@app.get("/dashboard/latency")
+async def dashboard_latency(
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to")
+):
+    start, end = dashboard_window(start, end, "day")
+    histograms = await dashboard_builder.latency(start, end)
+    routes = sorted(({"route": route, **h.summary()} for route, h in histograms.items()), key=lambda x: x["p99"], reverse=True)
+    return {"from": start.isoformat(), "to": end.isoformat(), "routes": routes}
+
+
+from fastapi.responses import PlainTextResponse
+from app.services.metrics import metrics, render
+
+# Formato de texto de Prometheus; con METRICS_MULTIPROC_DIR suma todos los workers
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(render(metrics.collect()), media_type="text/plain; version=0.0.4")
+
+
+
 
+# Con las plantillas registradas, el dashboard atribuye features exactas también a las líneas antiguas del log
+from app.services.analytics import register_routes
+register_routes(app.routes)